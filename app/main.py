@@ -7,7 +7,8 @@ import hashlib
 import logging
 import os
 import time
-from typing import Optional
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
 
 from fastapi import Body, FastAPI, Request
 from fastapi.exceptions import RequestValidationError
@@ -16,11 +17,13 @@ from fastapi.responses import JSONResponse
 from app.models import HealthResponse, ParseBillingRequest, ParseBillingResponse
 from app.services.downloader import DownloadError, InvalidPDFError, download_pdf
 from app.services.pdf_parser import (
+    OCR_CONCURRENCY,
     PDFTextExtractionError,
     ParsedBillingFields,
     is_text_too_short,
     parse_billing_text,
     extract_text_from_pdf,
+    shutdown_page_text_pool,
 )
 from app.services.validation import is_valid_http_url
 
@@ -38,7 +41,6 @@ def _env_int(name: str, default: int, minimum: int = 1) -> int:
         return default
 
 
-OCR_CONCURRENCY = _env_int("OCR_CONCURRENCY", 1, minimum=1)
 RESULT_CACHE_TTL_SECONDS = _env_int("RESULT_CACHE_TTL_SECONDS", 900, minimum=60)
 RESULT_CACHE_MAX_ITEMS = _env_int("RESULT_CACHE_MAX_ITEMS", 256, minimum=16)
 
@@ -46,10 +48,19 @@ ocr_semaphore = asyncio.Semaphore(OCR_CONCURRENCY)
 cache_lock = asyncio.Lock()
 result_cache: dict[str, tuple[float, ParsedBillingFields]] = {}
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """Release the page-text worker processes when the app stops."""
+    yield
+    shutdown_page_text_pool()
+
+
 app = FastAPI(
     title="Hospital Billing Parser API",
     version="1.0.0",
     description="Extract nama and total_tagihan from Indonesian hospital billing PDFs.",
+    lifespan=lifespan,
 )
 
 
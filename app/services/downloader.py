@@ -19,7 +19,7 @@ class InvalidPDFError(DownloadError):
     """Raised when downloaded content is not recognized as a PDF."""
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DownloadedFile:
     """Downloaded file payload."""
 
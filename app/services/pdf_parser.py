@@ -2,12 +2,21 @@
 
 from __future__ import annotations
 
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from difflib import SequenceMatcher
 import io
+import multiprocessing
 import os
 import re
+import string
+import sys
+import threading
 from dataclasses import dataclass
-from typing import Optional
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, Optional, Sequence
 
 import pdfplumber
 
@@ -16,7 +25,7 @@ class PDFTextExtractionError(Exception):
     """Raised when PDF text extraction fails."""
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ParsedBillingFields:
     """Normalized billing fields extracted from PDF text."""
 
@@ -29,7 +38,7 @@ class ParsedBillingFields:
     ai_bundle: dict[str, object]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TextExtractionResult:
     """Extracted text plus diagnostics about OCR/machine-text pipeline."""
 
@@ -37,7 +46,16 @@ class TextExtractionResult:
     diagnostics: dict[str, object]
 
 
-_NAME_STOP_KEYWORDS = (
+@dataclass(frozen=True, slots=True)
+class _SegmentExtraction:
+    """Total and components already extracted while ranking a billing segment."""
+
+    total_tagihan_raw: Optional[str]
+    total_tagihan_int: Optional[int]
+    komponen_billing: dict[str, dict[str, object]]
+
+
+_NAME_STOP_KEYWORDS = {
     "TGL",
     "TAGIHAN",
     "LAHIR",
@@ -64,17 +82,31 @@ _NAME_STOP_KEYWORDS = (
     "TOTAL",
     "BIAYA",
     "RINCIAN",
-)
+}
 
-_NAME_PATTERNS = (
-    re.compile(
-        r"(?is)\bNO\.?\s*REKAM\s*MEDIS\b.*?\bNAMA(?:\s+PASIEN)?\b\s*[:\-]?\s*(?!RS(?:UD)?\b|RUMAH\s+SAKIT\b)(.+?)(?=\b(?:TGL\.?\s*TAGIHAN|CARA\s*BAYAR|JENIS\s*KELAMIN|NO\.?\s*TAGIHAN|NO\.?\s*REKAM\s*MEDIS|ALAMAT|UMUR|DOKTER|PENJAMIN|RUANG|KELAS|NIK|DIAGNOSA|RAWAT|POLI)\b|$)"
+_NAME_VALUE_CAPTURE = r"\s*[:\-]?\s*(?!RS(?:UD)?\b|RUMAH\s+SAKIT\b)(.+?)"
+_NAME_STOP_LOOKAHEAD = (
+    r"(?=\b(?:TGL\.?\s*TAGIHAN|CARA\s*BAYAR|JENIS\s*KELAMIN|NO\.?\s*TAGIHAN|NO\.?\s*REKAM\s*MEDIS"
+    r"|ALAMAT|UMUR|DOKTER|PENJAMIN|RUANG|KELAS|NIK|DIAGNOSA|RAWAT|POLI)\b|$)"
+)
+# Every name pattern needs a NAMA label; extract_nama checks this literal once
+# up front. Patterns that need a further literal are paired with it, so texts
+# without it skip the lazy DOTALL scan entirely.
+_NAMA_LITERAL_PATTERN = re.compile(r"(?i)NAMA")
+_NAME_PATTERNS: tuple[tuple[Optional[re.Pattern[str]], re.Pattern[str]], ...] = (
+    (
+        re.compile(r"(?i)REKAM"),
+        re.compile(
+            r"(?is)\bNO\.?\s*REKAM\s*MEDIS\b.*?\bNAMA(?:\s+PASIEN)?\b" + _NAME_VALUE_CAPTURE + _NAME_STOP_LOOKAHEAD
+        ),
     ),
-    re.compile(
-        r"(?is)\bNAMA\s+PASIEN\b\s*[:\-]?\s*(?!RS(?:UD)?\b|RUMAH\s+SAKIT\b)(.+?)(?=\b(?:TGL\.?\s*TAGIHAN|CARA\s*BAYAR|JENIS\s*KELAMIN|NO\.?\s*TAGIHAN|NO\.?\s*REKAM\s*MEDIS|ALAMAT|UMUR|DOKTER|PENJAMIN|RUANG|KELAS|NIK|DIAGNOSA|RAWAT|POLI)\b|$)"
+    (
+        re.compile(r"(?i)PASIEN"),
+        re.compile(r"(?is)\bNAMA\s+PASIEN\b" + _NAME_VALUE_CAPTURE + _NAME_STOP_LOOKAHEAD),
     ),
-    re.compile(
-        r"(?is)\bNAMA\b\s*[:\-]?\s*(?!RS(?:UD)?\b|RUMAH\s+SAKIT\b)(.+?)(?=\b(?:TGL\.?\s*TAGIHAN|CARA\s*BAYAR|JENIS\s*KELAMIN|NO\.?\s*TAGIHAN|NO\.?\s*REKAM\s*MEDIS|ALAMAT|UMUR|DOKTER|PENJAMIN|RUANG|KELAS|NIK|DIAGNOSA|RAWAT|POLI)\b|$)"
+    (
+        None,
+        re.compile(r"(?is)\bNAMA\b" + _NAME_VALUE_CAPTURE + _NAME_STOP_LOOKAHEAD),
     ),
 )
 
@@ -83,6 +115,69 @@ _TOTAL_PATTERN = re.compile(
 )
 _AMOUNT_TOKEN_PATTERN = re.compile(r"(?<!\d)(\d{1,3}(?:[.,\s]\d{3})+(?:,\d{1,2})?|\d{5,})(?!\d)")
 _RUPIAH_INLINE_PATTERN = re.compile(r"(?i)\bRP\.?\s*([0-9][0-9.,\s]{0,30})")
+_RUPIAH_DIGIT_PATTERN = re.compile(r"(?i)\bRP\.?\s*\d")
+_JUMLAH_WORD_PATTERN = re.compile(r"(?i)\bJUMLAH\b")
+_TOTAL_TAGIHAN_LABEL_PATTERN = re.compile(r"(?i)\bTOTAL\s*TAGIHAN\b")
+_NO_TAGIHAN_PATTERN = re.compile(r"(?is)\bNO\.?\s*TAGIHAN\b\D{0,12}([0-9][0-9\-\s]{5,})")
+_RINCIAN_HEADER_PATTERN = re.compile(r"(?i)\bRINCIAN\s+BIAYA\s+PELAYANAN\s+PASIEN\b")
+_PAGE_HEADER_PATTERN = re.compile(r"^\s*===\s*PAGE\s+(\d+)\s*===\s*$", re.IGNORECASE)
+_DATE_PATTERN = re.compile(r"\b\d{1,2}[\/\.-]\d{1,2}[\/\.-]\d{2,4}\b")
+_TIME_PATTERN = re.compile(r"\b\d{1,2}[:\.]\d{2}(?::\d{2})?\b")
+_KODING_MARKER_PATTERN = re.compile(r"\bINA-?CBG\b|\bICD\b|\bGROUPING\b")
+_URL_PREFIX_PATTERN = re.compile(r"https?://", re.IGNORECASE)
+_URL_PATTERN = re.compile(r"https?://[^\s]+", re.IGNORECASE)
+_LUNAS_WORD_PATTERN = re.compile(r"(?i)\bLUNAS\b")
+_SISA_PEMBAYARAN_ZERO_PATTERN = re.compile(r"(?is)SISA\s*PEMBAYARAN.{0,40}(?:RP\.?\s*)?0(?:[.,]0+)?\b")
+_TOTAL_BAYAR_TUNAI_ZERO_PATTERN = re.compile(
+    r"(?is)TOTAL\s*BAYAR(?:/|\s+)?\s*TUNAI.{0,30}(?:RP\.?\s*)?0(?:[.,]0+)?\b"
+)
+_RAWAT_INAP_PATTERN = re.compile(r"\bRAWAT\s+INAP\b")
+_RAWAT_JALAN_PATTERN = re.compile(r"\bRAWAT\s+JALAN\b")
+_RANAP_HINT_PATTERN = re.compile(r"\bICU\b|\bNICU\b|\bHCU\b|\bVISITE\b")
+_RAJAL_HINT_PATTERN = re.compile(r"\bPOLI\b|\bPOLIKLINIK\b|\bKONSULTASI\b")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_DIGIT_CHAR_PATTERN = re.compile(r"[0-9]")
+_NON_UPPER_ALPHA_PATTERN = re.compile(r"[^A-Z\s]")
+_NON_ASCII_ALPHA_PATTERN = re.compile(r"[^A-Za-z]")
+_NON_NAME_CHAR_PATTERN = re.compile(r"[^A-Za-z'.-]")
+_ALPHA_RUN_PATTERN = re.compile(r"[A-Za-z]{3,}")
+_AMOUNT_ONLY_PATTERN = re.compile(r"(?:RP\.?\s*)?\d[\d.,\s]{2,20}")
+_AMOUNT_CANDIDATE_PATTERN = re.compile(r"\d{1,3}(?:[.,]\d{3})+(?:,\d{1,2})?|\d{4,}")
+_RUPIAH_HINT_PATTERN = re.compile(r"\bR\s*P\b|\bRUPIAH\b")
+# An `Rp` amount or a dot/comma-grouped number; phone numbers and dates do not match.
+_PAGE_AMOUNT_MARKER_PATTERN = re.compile(r"(?i)\bRP\.?\s*\d|(?<![\d.,])\d{1,3}(?:[.,]\d{3})+(?!\d)")
+_NAMA_LABEL_PATTERN = re.compile(r"(?i)\bNAMA(?:\s+PASIEN)?\b")
+_NAMA_RS_PATTERN = re.compile(r"(?i)\bNAMA\s+RS\b")
+_TOTAL_WORD_PATTERN = re.compile(r"(?i)\bTOTAL\b")
+_TAGIHAN_WORD_PATTERN = re.compile(r"(?i)\bTAGIHAN\b")
+_TAGIHAN_LITERAL_PATTERN = re.compile(r"(?i)TAGIHAN")
+_TOTAL_TAGIHAN_PHRASE_PATTERN = re.compile(r"(?i)\bTOTAL\s+TAGIHAN\b")
+_SUBTOTAL_LABEL_PATTERN = re.compile(r"\b(JUMLAH|TOTAL|SUBTOTAL)\b")
+_IDENTIFIER_LABEL_PATTERN = re.compile(r"\bNO\.?\s*(TAGIHAN|REKAM|SEP|RM)\b")
+_NON_AMOUNT_CONTEXT_PATTERN = re.compile(r"\b(UMUR|TAHUN|HARI|TGL|TANGGAL|TELEPON|TELP|JAM MASUK|JAM KELUAR)\b")
+_PAYMENT_SUMMARY_LABEL_PATTERN = re.compile(r"(?i)\b(PENJAMIN|KASIR|TOTAL BAYAR|SISA PEMBAYARAN)\b")
+_FARMASI_HEADER_PATTERN = re.compile(r"(?i)^\s*(FARMASI|APOTIK)\b")
+_JUMLAH_FARMASI_PATTERN = re.compile(r"(?i)^\s*JUMLAH\b.*\b(FARMASI|APOTIK)\b")
+_JUMLAH_OBAT_PATTERN = re.compile(r"(?i)\bJUMLAH\b.*\b(FARMASI|APOTIK|OBAT)\b")
+_JUMLAH_RUPIAH_ONLY_PATTERN = re.compile(r"(?i)\bJUMLAH\b\s*(?:RP\.?|RUPIAH)\b")
+_OBAT_HEADER_PATTERN = re.compile(r"(?i)^\s*OBAT(?:\s+(KRONIS|KEMOTERAPI))?\b\s*:?\s*$")
+_BMHP_LABEL_PATTERN = re.compile(r"(?i)\b(BMHP|BHP|BAHAN MEDIS HABIS PAKAI|BAHAN HABIS PAKAI)\b")
+_BILLING_TAIL_MARKER_PATTERN = re.compile(r"(?i)\b(RINCIAN\s+BIAYA|TOTAL\s+TAGIHAN|KASIR|CARA\s+BAYAR)\b")
+_EKLAIM_MENTION_PATTERN = re.compile(r"(?is)\bE-?KLAIM\b.{0,80}")
+_QUALITY_MARKER_PATTERNS = tuple(
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r"\bRINCIAN\s+BIAYA\b",
+        r"\bTOTAL\s+TAGIHAN\b",
+        r"\bNO\.?\s*TAGIHAN\b",
+        r"\bNO\.?\s*REKAM\s*MEDIS\b",
+        r"\bUNIT\s+LAYANAN\b",
+        r"\bLABORATORIUM\b",
+        r"\bRADIOLOGI\b",
+        r"\bFARMASI\b",
+        r"\bKASIR\b",
+    )
+)
 
 _NAME_BLOCKLIST_PHRASES = (
     "RUMAH SAKIT",
@@ -195,6 +290,20 @@ _COMPONENT_LABELS: dict[str, str] = {
 }
 
 COMPONENT_FIELD_KEYS = tuple(_COMPONENT_ALIASES.keys())
+_COMPONENT_KEY_INDEX: dict[str, int] = {key: index for index, key in enumerate(COMPONENT_FIELD_KEYS)}
+# Flat `(alias, key)` view in component order, for "does any component alias match" scans.
+_COMPONENT_ALIAS_FLAT: tuple[tuple[str, str], ...] = tuple(
+    (alias, key) for key, aliases in _COMPONENT_ALIASES.items() for alias in aliases
+)
+# `(alias, (key_index,))` table for the per-line alias scan in `_component_keys_by_line`.
+_COMPONENT_ALIAS_KEY_INDICES: tuple[tuple[str, tuple[int, ...]], ...] = tuple(
+    (alias, (_COMPONENT_KEY_INDEX[key],)) for alias, key in _COMPONENT_ALIAS_FLAT
+)
+# Literal alternation per component; equivalent to `any(alias in upper for alias in aliases)`.
+_COMPONENT_ALIAS_PATTERNS: dict[str, re.Pattern[str]] = {
+    key: re.compile("|".join(re.escape(alias) for alias in aliases))
+    for key, aliases in _COMPONENT_ALIASES.items()
+}
 
 _DOCUMENT_PROFILE_MARKERS: dict[str, tuple[str, ...]] = {
     "rajal": (
@@ -303,6 +412,9 @@ _GENERIC_NOISE_PATTERNS = (
     r"\bUMUR\s*HARI\b",
     r"\bUNIT\s*LAYANAN\b",
 )
+# One capture group per noise pattern; the alternatives never overlap, so the
+# distinct `lastindex` values seen by `finditer` equal the patterns that match.
+_GENERIC_NOISE_PATTERN = re.compile("|".join(f"({pattern})" for pattern in _GENERIC_NOISE_PATTERNS))
 
 _SUMMARY_STRATEGY: dict[str, str] = {
     "radiologi": "sum_summary",
@@ -419,10 +531,24 @@ PAYLOAD_SNIPPET_MAX_CHARS = _env_int("PAYLOAD_SNIPPET_MAX_CHARS", 320, minimum=1
 PAYLOAD_MAX_PARTS_PER_KEY = _env_int("PAYLOAD_MAX_PARTS_PER_KEY", 15, minimum=5)
 OCR_ENRICH_ALWAYS = _env_bool("OCR_ENRICH_ALWAYS", False)
 DOC_VALIDATION_MIN_SCORE = _env_int("DOC_VALIDATION_MIN_SCORE", 45, minimum=1)
+OCR_PAGE_WORKERS = _env_int("OCR_PAGE_WORKERS", 1, minimum=1)
+# Documents extracted at once (main.py's semaphore around extract_text_from_pdf).
+OCR_CONCURRENCY = _env_int("OCR_CONCURRENCY", 1, minimum=1)
+OCR_MAX_RENDER_WIDTH = _env_int("OCR_MAX_RENDER_WIDTH", 2400, minimum=600)
+OCR_RICH_TEXT_MIN_CHARS = _env_int("OCR_RICH_TEXT_MIN_CHARS", 1500, minimum=200)
+OCR_SPARSE_PAGE_CHARS = _env_int("OCR_SPARSE_PAGE_CHARS", 40, minimum=1)
+PDF_TEXT_WORKERS = _env_int("PDF_TEXT_WORKERS", 1, minimum=1)
+PDF_TEXT_PARALLEL_MIN_PAGES = _env_int("PDF_TEXT_PARALLEL_MIN_PAGES", 64, minimum=2)
+OCR_EARLY_STOP = _env_bool("OCR_EARLY_STOP", False)
+PDF_SECONDARY_TEXT_ALWAYS = _env_bool("PDF_SECONDARY_TEXT_ALWAYS", False)
 
 
 def create_empty_ocr_payload() -> dict[str, str]:
-    """Create normalized empty payload expected by downstream AI parser."""
+    """Create normalized empty payload expected by downstream AI parser.
+
+    Public helper for callers that need a payload placeholder before (or
+    without) parsing; it has the same keys as `extract_ocr_payload` output.
+    """
     return {key: "" for key in OCR_PAYLOAD_KEYS}
 
 
@@ -459,26 +585,39 @@ def _split_evidence(payload_value: str, max_items: int = 10) -> list[str]:
     return evidence
 
 
+# The same OCR lines and snippets are squashed many times per document; cached
+# results also keep their string hash, which speeds up the downstream caches.
+# Callers holding whole pages or documents join directly instead of pinning them here.
+@lru_cache(maxsize=4096)
 def _squash_whitespace(text: str) -> str:
     """Collapse repeated whitespace into single spaces."""
-    return re.sub(r"\s+", " ", text).strip()
+    return " ".join(text.split())
+
+
+def _split_nonempty_lines(text: str) -> tuple[str, ...]:
+    """Return the squashed non-empty lines of ``text``.
+
+    Total, component, farmasi and conflict passes all read the same document
+    lines; `parse_billing_text` splits once and passes the tuple down as `lines`.
+    """
+    return tuple(_squash_whitespace(line) for line in text.splitlines() if line.strip())
 
 
 def _count_non_space_chars(text: str) -> int:
     """Count non-space characters for OCR quality/coverage diagnostics."""
-    return len(re.sub(r"\s+", "", text))
+    return sum(map(len, text.split()))
 
 
 def _score_ocr_candidate(text: str) -> int:
     """Heuristic score to choose better OCR candidate text."""
-    normalized = _squash_whitespace(text)
+    normalized = " ".join(text.split())
     if not normalized:
         return 0
 
     upper = normalized.upper()
     score = min(24, len(normalized) // 160)
-    score += min(24, len(re.findall(r"(?i)\bRP\.?\s*\d", normalized)) * 4)
-    score += min(18, len(re.findall(r"\b\d{1,2}[\/\.-]\d{1,2}[\/\.-]\d{2,4}\b", normalized)) * 3)
+    score += min(24, len(_RUPIAH_DIGIT_PATTERN.findall(normalized)) * 4)
+    score += min(18, len(_DATE_PATTERN.findall(normalized)) * 3)
 
     critical_markers = (
         "RINCIAN BIAYA",
@@ -559,12 +698,13 @@ def _build_extraction_diagnostics(
     return diagnostics
 
 
+@lru_cache(maxsize=4096)
 def _canonical_line_key(text: str) -> str:
     """Canonicalize OCR line for deduplication across minor OCR variants."""
     compact = _squash_whitespace(text).upper()
-    compact = re.sub(r"[0-9]", " ", compact)
-    compact = re.sub(r"[^A-Z\s]", " ", compact)
-    compact = re.sub(r"\s+", " ", compact).strip()
+    compact = _DIGIT_CHAR_PATTERN.sub(" ", compact)
+    compact = _NON_UPPER_ALPHA_PATTERN.sub(" ", compact)
+    compact = _WHITESPACE_PATTERN.sub(" ", compact).strip()
     return compact
 
 
@@ -574,10 +714,12 @@ def _sum_amount_by_keywords(
     include_keywords: tuple[str, ...],
     exclude_keywords: tuple[str, ...] = (),
     cap: int = 10_000_000,
+    lines: Optional[tuple[str, ...]] = None,
 ) -> tuple[int, list[str]]:
     """Sum deduplicated line amounts matched by keyword include/exclude filters."""
-    lines = [_squash_whitespace(line) for line in text.splitlines() if line.strip()]
-    seen: set[str] = set()
+    if lines is None:
+        lines = _split_nonempty_lines(text)
+    seen: set[tuple[int, str]] = set()
     hits: list[tuple[int, str]] = []
 
     for line in lines:
@@ -586,14 +728,14 @@ def _sum_amount_by_keywords(
             continue
         if exclude_keywords and any(keyword in upper for keyword in exclude_keywords):
             continue
-        if not re.search(r"(?i)\bRP\.?\s*\d", line):
+        if not _RUPIAH_DIGIT_PATTERN.search(line):
             continue
 
         amount = _extract_amount_from_line(line)
         if amount is None or amount <= 0 or amount > cap:
             continue
 
-        dedup_key = f"{amount}|{_canonical_line_key(line)}"
+        dedup_key = (amount, _canonical_line_key(line))
         if dedup_key in seen:
             continue
         seen.add(dedup_key)
@@ -608,43 +750,40 @@ def _sum_pharmacy_line_items(
     text: str,
     *,
     total_tagihan_int: Optional[int],
+    lines: Optional[tuple[str, ...]] = None,
 ) -> tuple[Optional[int], list[str], Optional[str]]:
     """Recompute pharmacy subtotal by summing item rows inside the farmasi section."""
-    lines = [_squash_whitespace(line) for line in text.splitlines() if line.strip()]
+    if lines is None:
+        lines = _split_nonempty_lines(text)
     if not lines:
         return None, [], None
 
     in_section = False
     summary_line: Optional[str] = None
     item_hits: list[tuple[int, str]] = []
-    seen: set[str] = set()
+    seen: set[tuple[int, str]] = set()
     cap = max(2_000_000, int(total_tagihan_int * 1.2)) if isinstance(total_tagihan_int, int) else 10_000_000
 
     def is_pharmacy_section_start(line: str) -> bool:
-        if re.search(r"(?i)^\s*(FARMASI|APOTIK)\b", line):
+        if _FARMASI_HEADER_PATTERN.search(line):
             return True
-        if re.search(r"(?i)^\s*JUMLAH\b.*\b(FARMASI|APOTIK)\b", line):
+        if _JUMLAH_FARMASI_PATTERN.search(line):
             return True
-        if re.search(r"(?i)^\s*OBAT(?:\s+(KRONIS|KEMOTERAPI))?\b\s*:?\s*$", line):
+        if _OBAT_HEADER_PATTERN.search(line):
             return True
         return False
 
     def is_other_section_header(line: str) -> bool:
         upper = line.upper()
-        if re.search(r"(?i)\bTOTAL\s+TAGIHAN\b", line):
+        if _TOTAL_TAGIHAN_PHRASE_PATTERN.search(line):
             return True
-        if re.search(r"(?i)\b(PENJAMIN|KASIR|TOTAL BAYAR|SISA PEMBAYARAN)\b", line):
+        if _PAYMENT_SUMMARY_LABEL_PATTERN.search(line):
             return True
         if _extract_amount_from_line(line) is not None:
             return False
-        if re.search(r"(?i)\bJUMLAH\b", line):
+        if _JUMLAH_WORD_PATTERN.search(line):
             return False
-        for key, aliases in _COMPONENT_ALIASES.items():
-            if key == "obat":
-                continue
-            if any(alias in upper for alias in aliases):
-                return True
-        return False
+        return any(alias in upper for alias, key in _COMPONENT_ALIAS_FLAT if key != "obat")
 
     for line in lines:
         upper = line.upper()
@@ -656,20 +795,20 @@ def _sum_pharmacy_line_items(
         if is_other_section_header(line):
             break
 
-        if re.search(r"(?i)\bJUMLAH\b", line):
+        if _JUMLAH_WORD_PATTERN.search(line):
             amount_on_summary = _extract_amount_from_line(line)
             if amount_on_summary is not None and amount_on_summary > 0:
                 summary_line = line
                 break
 
-        if not re.search(r"(?i)\bRP\.?\s*\d", line):
+        if not _RUPIAH_DIGIT_PATTERN.search(line):
             continue
 
         amount = _extract_amount_from_line(line)
         if amount is None or amount <= 0 or amount > cap:
             continue
 
-        dedup_key = f"{amount}|{_canonical_line_key(line)}"
+        dedup_key = (amount, _canonical_line_key(line))
         if dedup_key in seen:
             continue
         seen.add(dedup_key)
@@ -721,8 +860,11 @@ def _apply_component_fallbacks(
     *,
     components: dict[str, dict[str, object]],
     total_tagihan_int: Optional[int],
+    lines: Optional[tuple[str, ...]] = None,
 ) -> None:
     """Apply conservative fallback extraction for categories that often miss in OCR noise."""
+    if lines is None:
+        lines = _split_nonempty_lines(text)
     cap = max(2_000_000, int(total_tagihan_int * 1.5)) if isinstance(total_tagihan_int, int) else 10_000_000
 
     non_bedah = components.get("prosedur_non_bedah")
@@ -732,6 +874,7 @@ def _apply_component_fallbacks(
             include_keywords=_NON_BEDAH_FALLBACK_KEYWORDS,
             exclude_keywords=_NON_BEDAH_FALLBACK_EXCLUDE_KEYWORDS,
             cap=cap,
+            lines=lines,
         )
         existing_non_bedah_amount = non_bedah.get("nilai_int")
         should_apply_non_bedah_fallback = not isinstance(existing_non_bedah_amount, int)
@@ -753,6 +896,7 @@ def _apply_component_fallbacks(
             include_keywords=_KONSULTASI_FALLBACK_KEYWORDS,
             exclude_keywords=_KONSULTASI_FALLBACK_EXCLUDE_KEYWORDS,
             cap=cap,
+            lines=lines,
         )
         if konsultasi_amount > 0:
             konsultasi["ditemukan"] = True
@@ -771,6 +915,7 @@ def _apply_component_fallbacks(
                 include_keywords=_BMHP_FALLBACK_KEYWORDS,
                 exclude_keywords=_BMHP_FALLBACK_EXCLUDE_KEYWORDS,
                 cap=cap,
+                lines=lines,
             )
             if fallback_bmhp_amount > 0:
                 bmhp["ditemukan"] = True
@@ -786,6 +931,7 @@ def _apply_component_fallbacks(
     pharmacy_item_total, pharmacy_lines, pharmacy_summary = _sum_pharmacy_line_items(
         text,
         total_tagihan_int=total_tagihan_int,
+        lines=lines,
     )
     if isinstance(pharmacy_item_total, int) and pharmacy_item_total > 0:
         existing_obat_amount = obat.get("nilai_int")
@@ -810,14 +956,14 @@ def _apply_component_fallbacks(
     if (
         isinstance(obat.get("nilai_int"), int)
         and isinstance(obat_raw, str)
-        and re.search(r"(?i)\bJUMLAH\b", obat_raw)
+        and _JUMLAH_WORD_PATTERN.search(obat_raw)
         and isinstance(bmhp, dict)
         and isinstance(bmhp.get("nilai_int"), int)
     ):
         bmhp_raw = bmhp.get("nilai_raw")
         bmhp_explicit_section = bool(
             isinstance(bmhp_raw, str)
-            and re.search(r"(?i)\b(BMHP|BHP|BAHAN MEDIS HABIS PAKAI|BAHAN HABIS PAKAI)\b", bmhp_raw)
+            and _BMHP_LABEL_PATTERN.search(bmhp_raw)
         )
         if not bmhp_explicit_section and bmhp["nilai_int"] < obat["nilai_int"]:  # type: ignore[index]
             components["bmhp"] = _blank_component_result("bmhp")
@@ -836,7 +982,7 @@ def _apply_component_fallbacks(
     obat_raw = obat.get("nilai_raw")
     if not isinstance(obat_raw, str):
         return
-    if not re.search(r"(?i)\bJUMLAH\b.*\b(FARMASI|APOTIK|OBAT)\b", obat_raw):
+    if not _JUMLAH_OBAT_PATTERN.search(obat_raw):
         return
 
     adjusted_amount = obat_amount - bmhp_amount
@@ -847,9 +993,16 @@ def _apply_component_fallbacks(
     obat["nilai_raw"] = f"{obat_raw} (dikurangi BMHP {_format_rupiah(bmhp_amount)})"
 
 
+# Amount tokens repeat heavily (page subtotals, the total echoed in summary
+# lines), and the result depends only on the token.
+@lru_cache(maxsize=4096)
 def _parse_rupiah_amount(amount_token: str) -> Optional[int]:
     """Parse rupiah text into integer while tolerating separators and optional decimals."""
-    compact = re.sub(r"\s+", "", amount_token)
+    # Plain digit runs are the most common token shape and need no cleanup.
+    if amount_token.isdecimal():
+        return int(amount_token)
+
+    compact = "".join(amount_token.split())
     if not compact:
         return None
 
@@ -858,7 +1011,8 @@ def _parse_rupiah_amount(amount_token: str) -> Optional[int]:
         if len(parts) > 1 and parts[-1].isdigit() and len(parts[-1]) <= 2:
             compact = "".join(parts[:-1])
 
-    digits = re.sub(r"[^\d]", "", compact)
+    # `str.isdecimal` is exactly the regex `\d` class (Unicode Nd), without the regex engine.
+    digits = "".join(filter(str.isdecimal, compact))
     if not digits:
         return None
 
@@ -874,6 +1028,9 @@ def _looks_like_grouped_amount_parts(parts: list[str]) -> bool:
     return all(len(part) == 3 for part in parts[1:])
 
 
+# Called for every amount token on total lines, both in the pattern pass and the
+# line fallback; like _parse_rupiah_amount it depends only on the token.
+@lru_cache(maxsize=4096)
 def _parse_total_amount(amount_token: str) -> Optional[int]:
     """Parse total-tagihan amount while trimming common OCR tail noise."""
     normalized = _squash_whitespace(amount_token)
@@ -928,9 +1085,9 @@ def _is_total_followup_line(line: str) -> bool:
     normalized = _squash_whitespace(line).upper()
     if not normalized:
         return False
-    if re.search(r"\bRP\.?\s*\d", normalized):
+    if _RUPIAH_DIGIT_PATTERN.search(normalized):
         return True
-    return bool(re.fullmatch(r"(?:RP\.?\s*)?\d[\d.,\s]{2,20}", normalized))
+    return bool(_AMOUNT_ONLY_PATTERN.fullmatch(normalized))
 
 
 def _is_valid_total_candidate(amount_token: str, parsed_amount: int, context: str) -> bool:
@@ -938,14 +1095,12 @@ def _is_valid_total_candidate(amount_token: str, parsed_amount: int, context: st
     if parsed_amount <= 0 or parsed_amount > 999_999_999:
         return False
 
-    compact_token = re.sub(r"\s+", "", amount_token)
-    digits_only = re.sub(r"[^\d]", "", compact_token)
-    has_separator = bool(re.search(r"[.,]", compact_token))
+    compact_token = "".join(amount_token.split())
+    digits_only = "".join(filter(str.isdecimal, compact_token))
+    has_separator = "." in compact_token or "," in compact_token
 
     normalized_context = _squash_whitespace(context).upper()
-    has_rupiah_hint = bool(
-        re.search(r"\bR\s*P\b", normalized_context) or re.search(r"\bRUPIAH\b", normalized_context)
-    )
+    has_rupiah_hint = bool(_RUPIAH_HINT_PATTERN.search(normalized_context))
 
     if _is_total_table_header_line(normalized_context):
         return False
@@ -975,10 +1130,14 @@ def _clean_name_candidate(candidate: str) -> Optional[str]:
             continue
 
         token_for_cleanup = token
-        if token_for_cleanup.endswith("!") and re.search(r"[A-Za-z]{3,}", token_for_cleanup):
+        if token_for_cleanup.endswith("!") and _ALPHA_RUN_PATTERN.search(token_for_cleanup):
             token_for_cleanup = f"{token_for_cleanup[:-1]}I"
 
-        cleaned = re.sub(r"[^A-Za-z'.-]", "", token_for_cleanup)
+        # Plain ASCII-letter tokens (the common case) have nothing to strip.
+        if token_for_cleanup.isascii() and token_for_cleanup.isalpha():
+            cleaned = token_for_cleanup
+        else:
+            cleaned = _NON_NAME_CHAR_PATTERN.sub("", token_for_cleanup)
         if not cleaned:
             if tokens:
                 break
@@ -1008,9 +1167,11 @@ def _clean_name_candidate(candidate: str) -> Optional[str]:
     return " ".join(tokens).strip()
 
 
+# The same handful of trailing OCR tokens recur across documents.
+@lru_cache(maxsize=1024)
 def _is_tail_noise_token(token: str) -> bool:
     """Return True when a trailing name token likely comes from OCR label noise."""
-    normalized = re.sub(r"[^A-Za-z]", "", token).upper()
+    normalized = _NON_ASCII_ALPHA_PATTERN.sub("", token).upper()
     if not normalized:
         return True
 
@@ -1019,19 +1180,34 @@ def _is_tail_noise_token(token: str) -> bool:
 
     if len(normalized) <= 6:
         for target in _NAME_TAIL_FUZZY_TARGETS:
-            if SequenceMatcher(None, normalized, target).ratio() >= 0.72:
+            # ratio() is 2*matches/total and matches <= the shorter length, so
+            # pairs whose lengths alone rule out 0.72 skip building a matcher;
+            # quick_ratio() is a cheaper upper bound checked before ratio().
+            total_length = len(normalized) + len(target)
+            if 2.0 * min(len(normalized), len(target)) / total_length < 0.72:
+                continue
+            matcher = SequenceMatcher(None, normalized, target)
+            if matcher.quick_ratio() >= 0.72 and matcher.ratio() >= 0.72:
                 return True
 
     return False
 
 
+_ASCII_UPPERCASE_DELETE_TABLE = str.maketrans("", "", string.ascii_uppercase)
+
+
+def _count_ascii_uppercase(text: str) -> int:
+    """Count A-Z characters in one C-level pass."""
+    return len(text) - len(text.translate(_ASCII_UPPERCASE_DELETE_TABLE))
+
+
 def _is_probable_patient_name(name: str) -> bool:
     """Return True when extracted name is likely a patient name, not hospital metadata."""
     normalized = f" {_squash_whitespace(name).upper()} "
     if not normalized.strip():
         return False
 
-    if re.search(r"\d", normalized):
+    if any(ch.isdecimal() for ch in normalized):
         return False
 
     if normalized.strip() in _NAME_EXACT_BLOCKLIST:
@@ -1045,7 +1221,7 @@ def _is_probable_patient_name(name: str) -> bool:
     if not tokens or len(tokens) > 6:
         return False
 
-    alpha_chars = sum(1 for ch in normalized if "A" <= ch <= "Z")
+    alpha_chars = _count_ascii_uppercase(normalized)
     if alpha_chars < 2:
         return False
 
@@ -1055,7 +1231,13 @@ def _is_probable_patient_name(name: str) -> bool:
 
 def extract_nama(text: str) -> Optional[str]:
     """Extract patient name from free-form billing text."""
-    for pattern in _NAME_PATTERNS:
+    # Every pattern and the line fallback below key off a NAMA label.
+    if not _NAMA_LITERAL_PATTERN.search(text):
+        return None
+
+    for required_literal, pattern in _NAME_PATTERNS:
+        if required_literal is not None and not required_literal.search(text):
+            continue
         for match in pattern.finditer(text):
             candidate = match.group(1)
             normalized = _clean_name_candidate(candidate)
@@ -1064,13 +1246,14 @@ def extract_nama(text: str) -> Optional[str]:
 
     lines = [line.strip() for line in text.splitlines() if line.strip()]
     for index, line in enumerate(lines):
-        if not re.search(r"(?i)\bNAMA(?:\s+PASIEN)?\b", line):
+        label_match = _NAMA_LABEL_PATTERN.search(line)
+        if not label_match:
             continue
 
-        if re.search(r"(?i)\bNAMA\s+RS\b", line):
+        if _NAMA_RS_PATTERN.search(line):
             continue
 
-        after_label = re.split(r"(?i)\bNAMA(?:\s+PASIEN)?\b", line, maxsplit=1)[-1]
+        after_label = line[label_match.end() :]
         candidates = [after_label]
         if not after_label.strip() and index + 1 < len(lines):
             candidates.append(lines[index + 1])
@@ -1109,7 +1292,7 @@ def _extract_name_hint_from_diagnostics(
     best_score = (-1, -1)
     for candidate in candidates:
         token_count = len(candidate.split())
-        alpha_count = sum(1 for char in candidate if "A" <= char <= "Z")
+        alpha_count = _count_ascii_uppercase(candidate)
         score = (token_count, alpha_count)
         if score > best_score:
             best_score = score
@@ -1118,12 +1301,18 @@ def _extract_name_hint_from_diagnostics(
     return best_name
 
 
-def extract_total_tagihan(text: str) -> tuple[Optional[str], Optional[int]]:
+def extract_total_tagihan(
+    text: str,
+    *,
+    lines: Optional[tuple[str, ...]] = None,
+) -> tuple[Optional[str], Optional[int]]:
     """Extract total billing phrase and numeric value in rupiah."""
-    selected_raw: Optional[str] = None
-    selected_value: Optional[int] = None
+    # Both the pattern pass and the line fallback below need a TAGIHAN label.
+    if not _TAGIHAN_LITERAL_PATTERN.search(text):
+        return None, None
 
-    for match in _TOTAL_PATTERN.finditer(text):
+    # The last valid match wins (final totals sit at the end), so validate from the end and stop early.
+    for match in reversed(list(_TOTAL_PATTERN.finditer(text))):
         amount_token = match.group(1)
         parsed_amount = _parse_total_amount(amount_token)
         if parsed_amount is None:
@@ -1133,15 +1322,18 @@ def extract_total_tagihan(text: str) -> tuple[Optional[str], Optional[int]]:
         if not _is_valid_total_candidate(amount_token, parsed_amount, candidate_raw):
             continue
 
-        selected_raw = candidate_raw
-        selected_value = parsed_amount
+        return candidate_raw, parsed_amount
 
-    if selected_value is not None:
-        return selected_raw, selected_value
+    # The line fallback needs TOTAL and TAGIHAN on one line; skip splitting when either is absent.
+    if not _TOTAL_WORD_PATTERN.search(text) or not _TAGIHAN_WORD_PATTERN.search(text):
+        return None, None
 
-    lines = [_squash_whitespace(line) for line in text.splitlines() if line.strip()]
-    for index, line in enumerate(lines):
-        if not re.search(r"(?i)\bTOTAL\b", line) or not re.search(r"(?i)\bTAGIHAN\b", line):
+    if lines is None:
+        lines = _split_nonempty_lines(text)
+    # As above, the last valid candidate wins, so scan lines and tokens from the end.
+    for index in range(len(lines) - 1, -1, -1):
+        line = lines[index]
+        if not _TOTAL_WORD_PATTERN.search(line) or not _TAGIHAN_WORD_PATTERN.search(line):
             continue
         if _is_total_table_header_line(line):
             continue
@@ -1158,16 +1350,15 @@ def extract_total_tagihan(text: str) -> tuple[Optional[str], Optional[int]]:
                     amount_tokens = _AMOUNT_TOKEN_PATTERN.findall(next_line)
                 raw_phrase = f"{line} {next_line}"
 
-        for amount_token in amount_tokens:
+        for amount_token in reversed(amount_tokens):
             parsed_amount = _parse_total_amount(amount_token)
             if parsed_amount is None:
                 continue
             if not _is_valid_total_candidate(amount_token, parsed_amount, raw_phrase):
                 continue
-            selected_raw = raw_phrase
-            selected_value = parsed_amount
+            return raw_phrase, parsed_amount
 
-    return selected_raw, selected_value
+    return None, None
 
 
 def _extract_amount_from_line(line: str) -> Optional[int]:
@@ -1176,7 +1367,7 @@ def _extract_amount_from_line(line: str) -> Optional[int]:
     if rupiah_tokens:
         rupiah_values = []
         for token in rupiah_tokens:
-            token_candidates = re.findall(r"\d{1,3}(?:[.,]\d{3})+(?:,\d{1,2})?|\d{4,}", token)
+            token_candidates = _AMOUNT_CANDIDATE_PATTERN.findall(token)
             value = None
             if token_candidates:
                 parsed_candidates = [
@@ -1201,30 +1392,30 @@ def _extract_amount_from_line(line: str) -> Optional[int]:
     for token in amount_tokens:
         value = _parse_rupiah_amount(token)
         if value is not None:
-            compact = re.sub(r"\s+", "", token)
-            digits_only = re.sub(r"[^\d]", "", compact)
-            has_separator = bool(re.search(r"[.,]", compact))
+            compact = "".join(token.split())
+            digits_only = "".join(filter(str.isdecimal, compact))
+            has_separator = "." in compact or "," in compact
             upper_line = line.upper()
-            has_rupiah_hint = bool(re.search(r"\bR\s*P\b", upper_line) or re.search(r"\bRUPIAH\b", upper_line))
+            has_rupiah_hint = bool(_RUPIAH_HINT_PATTERN.search(upper_line))
 
             if value <= 0 or value > 500_000_000:
                 continue
             if (
                 not has_rupiah_hint
                 and not has_separator
-                and not re.search(r"\b(JUMLAH|TOTAL|SUBTOTAL)\b", upper_line)
+                and not _SUBTOTAL_LABEL_PATTERN.search(upper_line)
             ):
                 continue
             if not has_rupiah_hint and not has_separator and len(digits_only) >= 8:
                 continue
             if (
                 not has_rupiah_hint
-                and re.search(r"\bNO\.?\s*(TAGIHAN|REKAM|SEP|RM)\b", upper_line)
+                and _IDENTIFIER_LABEL_PATTERN.search(upper_line)
             ):
                 continue
             if (
                 not has_rupiah_hint
-                and re.search(r"\b(UMUR|TAHUN|HARI|TGL|TANGGAL|TELEPON|TELP|JAM MASUK|JAM KELUAR)\b", upper_line)
+                and _NON_AMOUNT_CONTEXT_PATTERN.search(upper_line)
             ):
                 continue
 
@@ -1237,68 +1428,120 @@ def _extract_amount_from_line(line: str) -> Optional[int]:
     return parsed_values[-1]
 
 
-def _blank_component_result(component_key: str) -> dict[str, object]:
-    """Build an empty component payload for a known billing key."""
-    return {
-        "label": _COMPONENT_LABELS[component_key],
+_BLANK_COMPONENT_RESULTS: dict[str, dict[str, object]] = {
+    key: {
+        "label": _COMPONENT_LABELS[key],
         "ditemukan": False,
         "nilai_raw": None,
         "nilai_int": None,
     }
+    for key in COMPONENT_FIELD_KEYS
+}
 
 
-def extract_billing_components(text: str, *, total_tagihan_int: Optional[int] = None) -> dict[str, dict[str, object]]:
+def _blank_component_result(component_key: str) -> dict[str, object]:
+    """Build an empty component payload for a known billing key."""
+    # Copying a prebuilt template reuses its stored key hashes instead of rebuilding the dict.
+    return dict(_BLANK_COMPONENT_RESULTS[component_key])
+
+
+def _keyword_hits_by_line(
+    upper_lines: Sequence[str],
+    keyword_table: Iterable[tuple[str, tuple[object, ...]]],
+) -> list[set[object]]:
+    """Return, for each uppercased line, the values of every keyword found in it.
+
+    Each keyword is searched once across the newline-joined document with
+    `str.find`, and hits are mapped back to lines by bisecting line offsets,
+    instead of testing every keyword against every line. Keywords never
+    contain newlines, so a hit cannot straddle two lines.
+    """
+    blob = "\n".join(upper_lines)
+    line_starts: list[int] = []
+    offset = 0
+    for upper_line in upper_lines:
+        line_starts.append(offset)
+        offset += len(upper_line) + 1
+
+    matched: list[set[object]] = [set() for _ in upper_lines]
+    for keyword, values in keyword_table:
+        position = blob.find(keyword)
+        while position != -1:
+            line_index = bisect_right(line_starts, position) - 1
+            matched[line_index].update(values)
+            if line_index + 1 >= len(line_starts):
+                break
+            position = blob.find(keyword, line_starts[line_index + 1])
+    return matched
+
+
+def _component_keys_by_line(upper_lines: list[str]) -> list[tuple[tuple[int, str], ...]]:
+    """Return `(key_index, key)` pairs, in component order, with an alias in each line."""
+    matched = _keyword_hits_by_line(upper_lines, _COMPONENT_ALIAS_KEY_INDICES)
+    return [
+        tuple((key_index, COMPONENT_FIELD_KEYS[key_index]) for key_index in sorted(key_indices))
+        if key_indices
+        else ()
+        for key_indices in matched
+    ]
+
+
+def extract_billing_components(
+    text: str,
+    *,
+    total_tagihan_int: Optional[int] = None,
+    lines: Optional[tuple[str, ...]] = None,
+) -> dict[str, dict[str, object]]:
     """Extract requested billing components and optional nominal values."""
-    results: dict[str, dict[str, object]] = {
-        key: _blank_component_result(key)
-        for key in _COMPONENT_ALIASES
-    }
+    # Per-field positional columns (see _COMPONENT_KEY_INDEX); the public
+    # nested result dicts are only assembled on return.
+    found: list[bool] = [False] * len(COMPONENT_FIELD_KEYS)
+    nilai_raw: list[Optional[str]] = [None] * len(COMPONENT_FIELD_KEYS)
+    nilai_int: list[Optional[int]] = [None] * len(COMPONENT_FIELD_KEYS)
 
-    lines = [_squash_whitespace(line) for line in text.splitlines() if line.strip()]
-    upper_lines = [line.upper() for line in lines]
+    if lines is None:
+        lines = _split_nonempty_lines(text)
+    upper_lines = list(map(str.upper, lines))
 
     current_section_key: Optional[str] = None
-    amount_tracker: dict[str, list[tuple[int, str, bool]]] = {key: [] for key in _COMPONENT_ALIASES}
+    # Positional per-component buckets (see _COMPONENT_KEY_INDEX): appends are plain list indexing.
+    amount_tracker: list[list[tuple[int, str, bool]]] = [[] for _ in COMPONENT_FIELD_KEYS]
     amount_cap = max(2_000_000, int(total_tagihan_int * 1.5)) if isinstance(total_tagihan_int, int) else 10_000_000
 
     def has_recent_section_header(section_key: str, current_index: int, window: int = 25) -> bool:
         """Return True if a plain section header for `section_key` appears shortly before current line."""
-        aliases = _COMPONENT_ALIASES.get(section_key, ())
-        if not aliases:
+        alias_pattern = _COMPONENT_ALIAS_PATTERNS.get(section_key)
+        if alias_pattern is None:
             return False
 
         start = max(0, current_index - window)
         for prev_index in range(start, current_index):
             prev_line = lines[prev_index]
-            prev_upper = upper_lines[prev_index]
-            if not any(alias in prev_upper for alias in aliases):
+            if not alias_pattern.search(upper_lines[prev_index]):
                 continue
-            if re.search(r"(?i)\bRP\.?\s*\d", prev_line):
+            if _RUPIAH_DIGIT_PATTERN.search(prev_line):
                 continue
             if _extract_amount_from_line(prev_line) is not None:
                 continue
             return True
         return False
 
+    line_component_keys = _component_keys_by_line(upper_lines)
+
     for index, upper_line in enumerate(upper_lines):
         line = lines[index]
 
-        matched_header_keys: list[str] = []
-        for key, aliases in _COMPONENT_ALIASES.items():
-            if any(alias in upper_line for alias in aliases):
-                matched_header_keys.append(key)
+        matched_header_keys = line_component_keys[index]
         if matched_header_keys:
-            current_section_key = matched_header_keys[0]
+            current_section_key = matched_header_keys[0][1]
 
         summary_key: Optional[str] = None
         if "JUMLAH" in upper_line:
-            for key, aliases in _COMPONENT_ALIASES.items():
-                if any(alias in upper_line for alias in aliases):
-                    summary_key = key
-                    break
+            # The first matching alias in component order belongs to the first matched header key.
+            summary_key = matched_header_keys[0][1] if matched_header_keys else None
             if summary_key is None and current_section_key is not None:
                 # Avoid assigning ambiguous lines like "Jumlah Rp. 198.000" into the latest section.
-                generic_jumlah_only = bool(re.search(r"(?i)\bJUMLAH\b\s*(?:RP\.?|RUPIAH)\b", line))
+                generic_jumlah_only = bool(_JUMLAH_RUPIAH_ONLY_PATTERN.search(line))
                 if not generic_jumlah_only:
                     summary_key = current_section_key
                 elif has_recent_section_header(current_section_key, index):
@@ -1309,26 +1552,22 @@ def extract_billing_components(text: str, *, total_tagihan_int: Optional[int] =
             if (
                 amount_on_summary is not None
                 and amount_on_summary <= amount_cap
-                and re.search(r"(?i)\bRP\.?\s*\d", line)
+                and _RUPIAH_DIGIT_PATTERN.search(line)
             ):
-                section_result = results[summary_key]
-                section_result["ditemukan"] = True
-                section_result["nilai_raw"] = line
-                amount_tracker[summary_key].append((amount_on_summary, line, True))
+                summary_index = _COMPONENT_KEY_INDEX[summary_key]
+                found[summary_index] = True
+                nilai_raw[summary_index] = line
+                amount_tracker[summary_index].append((amount_on_summary, line, True))
                 current_section_key = summary_key
 
-        for key in matched_header_keys:
-            current = results[key]
-            current["ditemukan"] = True
+        for key_index, _ in matched_header_keys:
+            found[key_index] = True
 
             raw_line = line
             amount_value = _extract_amount_from_line(line)
             if amount_value is None and index + 1 < len(lines):
                 next_line = lines[index + 1]
-                next_upper = upper_lines[index + 1]
-                next_is_component_header = any(
-                    alias in next_upper for aliases in _COMPONENT_ALIASES.values() for alias in aliases
-                )
+                next_is_component_header = bool(line_component_keys[index + 1])
                 next_amount = _extract_amount_from_line(next_line)
                 if next_amount is not None and not next_is_component_header:
                     raw_line = f"{line} {next_line}"
@@ -1337,22 +1576,21 @@ def extract_billing_components(text: str, *, total_tagihan_int: Optional[int] =
             if amount_value is not None:
                 if amount_value > amount_cap:
                     continue
-                if re.search(r"(?i)\bRP\.?\s*\d", raw_line):
-                    amount_tracker[key].append((amount_value, raw_line, False))
-                if current["nilai_raw"] is None:
-                    current["nilai_raw"] = raw_line
-            elif current["nilai_raw"] is None:
-                current["nilai_raw"] = raw_line
-
-    for key, current in results.items():
-        records = amount_tracker.get(key, [])
+                if _RUPIAH_DIGIT_PATTERN.search(raw_line):
+                    amount_tracker[key_index].append((amount_value, raw_line, False))
+                if nilai_raw[key_index] is None:
+                    nilai_raw[key_index] = raw_line
+            elif nilai_raw[key_index] is None:
+                nilai_raw[key_index] = raw_line
+
+    for key_index, (key, records) in enumerate(zip(COMPONENT_FIELD_KEYS, amount_tracker)):
         if not records:
             continue
 
         item_records = [item for item in records if not item[2]]
-        dedup_item_lines: dict[str, int] = {}
+        dedup_item_lines: dict[tuple[int, str], int] = {}
         for amount_value, raw_line, _ in item_records:
-            dedup_key = f"{amount_value}|{_canonical_line_key(raw_line)}"
+            dedup_key = (amount_value, _canonical_line_key(raw_line))
             existing = dedup_item_lines.get(dedup_key)
             if existing is None or amount_value > existing:
                 dedup_item_lines[dedup_key] = amount_value
@@ -1360,9 +1598,9 @@ def extract_billing_components(text: str, *, total_tagihan_int: Optional[int] =
 
         summary_records = [item for item in records if item[2]]
         if summary_records:
-            unique_summary: dict[str, int] = {}
+            unique_summary: dict[tuple[int, str], int] = {}
             for amount_value, raw_line, _ in summary_records:
-                dedup_key = f"{amount_value}|{_canonical_line_key(raw_line)}"
+                dedup_key = (amount_value, _canonical_line_key(raw_line))
                 existing = unique_summary.get(dedup_key)
                 if existing is None or amount_value > existing:
                     unique_summary[dedup_key] = amount_value
@@ -1372,28 +1610,36 @@ def extract_billing_components(text: str, *, total_tagihan_int: Optional[int] =
             strategy = _SUMMARY_STRATEGY.get(key, "hybrid")
 
             if strategy == "sum_summary":
-                current["nilai_int"] = summary_sum
-                current["nilai_raw"] = summary_max_raw
+                nilai_int[key_index] = summary_sum
+                nilai_raw[key_index] = summary_max_raw
             elif strategy == "max_summary":
-                current["nilai_int"] = summary_max_amount
-                current["nilai_raw"] = summary_max_raw
+                nilai_int[key_index] = summary_max_amount
+                nilai_raw[key_index] = summary_max_raw
             else:
                 # Hybrid: trust item sum when summary looks too small/incomplete, but keep it bounded.
                 chosen_sum = summary_sum
                 if dedup_item_sum > summary_sum and dedup_item_sum <= amount_cap:
                     if summary_sum == 0 or dedup_item_sum <= summary_sum * 3:
                         chosen_sum = dedup_item_sum
-                current["nilai_int"] = chosen_sum
-                current["nilai_raw"] = summary_max_raw
+                nilai_int[key_index] = chosen_sum
+                nilai_raw[key_index] = summary_max_raw
             continue
 
         if dedup_item_lines:
             if key in {"kamar_akomodasi", "rawat_intensif"}:
-                current["nilai_int"] = max(dedup_item_lines.values())
+                nilai_int[key_index] = max(dedup_item_lines.values())
             else:
-                current["nilai_int"] = dedup_item_sum
+                nilai_int[key_index] = dedup_item_sum
 
-    return results
+    return {
+        key: {
+            "label": _COMPONENT_LABELS[key],
+            "ditemukan": found[key_index],
+            "nilai_raw": nilai_raw[key_index],
+            "nilai_int": nilai_int[key_index],
+        }
+        for key_index, key in enumerate(COMPONENT_FIELD_KEYS)
+    }
 
 
 def _component_hit_count(components: dict[str, dict[str, object]]) -> int:
@@ -1435,14 +1681,15 @@ def _sum_component_amounts(components: dict[str, dict[str, object]]) -> int:
     return total
 
 
-def _collect_total_candidates(text: str) -> list[int]:
+def _collect_total_candidates(text: str, *, lines: Optional[tuple[str, ...]] = None) -> list[int]:
     """Collect distinct total-tagihan candidates for conflict detection."""
-    lines = [_squash_whitespace(line) for line in text.splitlines() if line.strip()]
+    if lines is None:
+        lines = _split_nonempty_lines(text)
     seen: set[int] = set()
     candidates: list[int] = []
 
     for index, line in enumerate(lines):
-        if not re.search(r"(?i)\bTOTAL\b", line) or not re.search(r"(?i)\bTAGIHAN\b", line):
+        if not _TOTAL_WORD_PATTERN.search(line) or not _TAGIHAN_WORD_PATTERN.search(line):
             continue
         if _is_total_table_header_line(line):
             continue
@@ -1483,10 +1730,10 @@ def _split_billing_segments(text: str) -> list[str]:
     marker_indices = [
         index
         for index, line in enumerate(lines)
-        if re.search(r"(?i)\bRINCIAN\s+BIAYA\s+PELAYANAN\s+PASIEN\b", line)
+        if _RINCIAN_HEADER_PATTERN.search(line)
     ]
     if not marker_indices:
-        return [_squash_whitespace(text)]
+        return [" ".join(text.split())]
 
     segments: list[str] = []
     for marker_pos, start in enumerate(marker_indices):
@@ -1495,18 +1742,17 @@ def _split_billing_segments(text: str) -> list[str]:
         segment_text = "\n".join(segment_lines).strip()
         if segment_text:
             segments.append(segment_text)
-    return segments or [_squash_whitespace(text)]
+    return segments or [" ".join(text.split())]
 
 
 def _split_page_chunks(text: str) -> list[tuple[Optional[int], str]]:
     """Split OCR text into page-tagged chunks while preserving order."""
-    page_header = re.compile(r"^\s*===\s*PAGE\s+(\d+)\s*===\s*$", flags=re.IGNORECASE)
     chunks: list[tuple[Optional[int], str]] = []
     current_page: Optional[int] = None
     current_lines: list[str] = []
 
     for raw_line in text.splitlines():
-        match = page_header.match(raw_line)
+        match = _PAGE_HEADER_PATTERN.match(raw_line)
         if match:
             if current_lines:
                 chunk_text = "\n".join(current_lines).strip()
@@ -1544,17 +1790,18 @@ def _select_tail_billing_window(text: str, max_pages: int = 3) -> str:
     if not tail_text:
         return text
 
-    if re.search(r"(?i)\b(RINCIAN\s+BIAYA|TOTAL\s+TAGIHAN|KASIR|CARA\s+BAYAR)\b", tail_text):
+    if _BILLING_TAIL_MARKER_PATTERN.search(tail_text):
         return tail_text
     return text
 
 
 def _extract_no_tagihan(text: str) -> Optional[str]:
     """Extract normalized No. Tagihan identifier from segment text."""
-    match = re.search(r"(?is)\bNO\.?\s*TAGIHAN\b\D{0,12}([0-9][0-9\-\s]{5,})", text)
+    match = _NO_TAGIHAN_PATTERN.search(text)
     if not match:
         return None
-    digits = re.sub(r"[^\d]", "", match.group(1))
+    # The capture only holds ASCII digits, hyphens and whitespace.
+    digits = "".join(filter(str.isdecimal, match.group(1)))
     if len(digits) < 6:
         return None
     return digits
@@ -1562,12 +1809,20 @@ def _extract_no_tagihan(text: str) -> Optional[str]:
 
 def select_primary_billing_text(text: str) -> str:
     """Pick the most relevant billing segment when multiple episodes exist in one PDF."""
+    return _select_primary_billing_segment(text)[0]
+
+
+def _select_primary_billing_segment(text: str) -> tuple[str, Optional[_SegmentExtraction]]:
+    """Pick the primary billing segment plus the fields extracted while ranking it.
+
+    The extraction is None when there was only one candidate and nothing was ranked.
+    """
     narrowed_text = _select_tail_billing_window(text)
     candidates = _split_billing_segments(narrowed_text)
     if not candidates:
-        return narrowed_text
+        return narrowed_text, None
     if len(candidates) == 1:
-        return candidates[0]
+        return candidates[0], None
 
     grouped: dict[str, list[str]] = {}
     for index, segment in enumerate(candidates):
@@ -1580,13 +1835,15 @@ def select_primary_billing_text(text: str) -> str:
         grouped_candidates = candidates
 
     best_segment = grouped_candidates[0]
+    best_extraction: Optional[_SegmentExtraction] = None
     best_sort_key = (-1, -1, -1)
 
     for segment in grouped_candidates:
-        total_raw, total_int = extract_total_tagihan(segment)
-        components = extract_billing_components(segment, total_tagihan_int=total_int)
+        segment_lines = _split_nonempty_lines(segment)
+        total_raw, total_int = extract_total_tagihan(segment, lines=segment_lines)
+        components = extract_billing_components(segment, total_tagihan_int=total_int, lines=segment_lines)
         component_hits = _component_hit_count(components)
-        summary_hits = len(re.findall(r"(?i)\bJUMLAH\b", segment))
+        summary_hits = _count_word_hits(segment.upper(), "JUMLAH")
         has_total_phrase = 1 if total_raw else 0
         total_score = total_int if isinstance(total_int, int) else 0
 
@@ -1594,8 +1851,24 @@ def select_primary_billing_text(text: str) -> str:
         if sort_key > best_sort_key:
             best_sort_key = sort_key
             best_segment = segment
+            best_extraction = _SegmentExtraction(total_raw, total_int, components)
 
-    return best_segment
+    return best_segment, best_extraction
+
+
+def _count_word_hits(upper_text: str, word: str) -> int:
+    """Count whole-word occurrences of an uppercase word, matching regex `\\b` semantics."""
+    count = 0
+    text_length = len(upper_text)
+    start = upper_text.find(word)
+    while start != -1:
+        end = start + len(word)
+        before = upper_text[start - 1] if start > 0 else " "
+        after = upper_text[end] if end < text_length else " "
+        if not (before.isalnum() or before == "_") and not (after.isalnum() or after == "_"):
+            count += 1
+        start = upper_text.find(word, end)
+    return count
 
 
 def _count_phrase_hits(text: str, phrases: tuple[str, ...]) -> int:
@@ -1653,28 +1926,25 @@ def _apply_document_profile_to_components(
         components[component_key] = _blank_component_result(component_key)
 
 
-def _append_payload_text(payload: dict[str, str], key: str, value: str) -> None:
-    """Append unique related text into payload field using ` | ` separator."""
+def _append_payload_text(payload_parts: dict[str, dict[str, None]], key: str, value: str) -> None:
+    """Append unique related text into a payload field's ordered part set.
+
+    Parts are joined with ` | ` once the payload is complete, so membership and
+    the per-key cap are checked without re-splitting the accumulated string.
+    """
     normalized = _squash_whitespace(value)
     if not normalized:
         return
     if len(normalized) > PAYLOAD_SNIPPET_MAX_CHARS:
         normalized = f"{normalized[:PAYLOAD_SNIPPET_MAX_CHARS].rstrip()}...[TRUNCATED]"
 
-    current = payload.get(key, "")
-    if not current:
-        payload[key] = normalized
+    parts = payload_parts[key]
+    if normalized in parts or len(parts) >= PAYLOAD_MAX_PARTS_PER_KEY:
         return
+    parts[normalized] = None
 
-    existing_parts = {part.strip() for part in current.split(" | ") if part.strip()}
-    if len(existing_parts) >= PAYLOAD_MAX_PARTS_PER_KEY:
-        return
-    if normalized in existing_parts:
-        return
-    payload[key] = f"{current} | {normalized}"
 
-
-def _payload_keyword_map() -> dict[str, tuple[str, ...]]:
+def _build_payload_keyword_map() -> dict[str, tuple[str, ...]]:
     """Return broad keyword aliases for each OCR payload key."""
     component_map: dict[str, tuple[str, ...]] = {
         key: aliases for key, aliases in _COMPONENT_ALIASES.items()
@@ -1704,6 +1974,106 @@ def _payload_keyword_map() -> dict[str, tuple[str, ...]]:
     return component_map
 
 
+_PAYLOAD_KEYWORD_MAP = _build_payload_keyword_map()
+
+
+def _build_payload_keyword_keys() -> dict[str, tuple[str, ...]]:
+    """Invert the payload keyword map so each distinct keyword is scanned once per line."""
+    keyword_keys: dict[str, list[str]] = {}
+    for key, keywords in _PAYLOAD_KEYWORD_MAP.items():
+        for keyword in keywords:
+            keys = keyword_keys.setdefault(keyword, [])
+            if key not in keys:
+                keys.append(key)
+    return {keyword: tuple(keys) for keyword, keys in keyword_keys.items()}
+
+
+_PAYLOAD_KEYWORD_KEYS = _build_payload_keyword_keys()
+
+
+def _payload_keys_by_line(upper_lines: tuple[str, ...]) -> tuple[frozenset[str], ...]:
+    """Return the payload keys with at least one keyword in each uppercased line."""
+    matched = _keyword_hits_by_line(upper_lines, _PAYLOAD_KEYWORD_KEYS.items())
+    return tuple(frozenset(keys) for keys in matched)
+
+
+# `(lines, upper_lines, line_keys)` as returned by `_payload_line_index`.
+_PayloadLineIndex = tuple[tuple[str, ...], tuple[str, ...], tuple[frozenset[str], ...]]
+
+
+def _payload_line_index(text: str) -> _PayloadLineIndex:
+    """Return squashed lines, their uppercase forms and matched payload keys per line.
+
+    Context and payload extraction both scan the same focused text, so
+    `parse_billing_text` builds the index once and passes it to both. Lines are
+    interned so repeated page boilerplate shares one object and hits the
+    identity fast path in the snippet/payload dedup sets.
+    """
+    lines = tuple(sys.intern(_squash_whitespace(line)) for line in text.splitlines() if line.strip())
+    upper_lines = tuple(map(sys.intern, map(str.upper, lines)))
+    return lines, upper_lines, _payload_keys_by_line(upper_lines)
+
+
+def _component_snippet_bonus(normalized: str, upper: str) -> int:
+    """Reward component snippets that carry an inline rupiah amount."""
+    return 1 if _RUPIAH_DIGIT_PATTERN.search(upper) else 0
+
+
+def _billing_snippet_bonus(normalized: str, upper: str) -> int:
+    """Reward total/cashier snippets that mention billing totals or payments."""
+    score = 0
+    if _TOTAL_TAGIHAN_LABEL_PATTERN.search(upper):
+        score += 3
+    if _RUPIAH_DIGIT_PATTERN.search(upper):
+        score += 2
+    if "SISA PEMBAYARAN" in upper or "TOTAL BAYAR" in upper:
+        score += 2
+    if "PENJAMIN" in upper:
+        score += 1
+    return score
+
+
+def _timestamp_snippet_bonus(normalized: str, upper: str) -> int:
+    """Reward time-window snippets that contain a date or clock time."""
+    score = 0
+    if _DATE_PATTERN.search(normalized):
+        score += 2
+    if _TIME_PATTERN.search(normalized):
+        score += 1
+    return score
+
+
+def _koding_snippet_bonus(normalized: str, upper: str) -> int:
+    """Reward coding snippets that mention INA-CBG/ICD grouping."""
+    return 3 if _KODING_MARKER_PATTERN.search(upper) else 0
+
+
+def _link_snippet_bonus(normalized: str, upper: str) -> int:
+    """Reward E-Klaim snippets that contain a URL or the E-Klaim label."""
+    score = 0
+    if _URL_PREFIX_PATTERN.search(normalized):
+        score += 4
+    if "E-KLAIM" in upper or "EKLAIM" in upper:
+        score += 2
+    return score
+
+
+# Key-specific score bonus, chosen once so each snippet only runs the checks its key uses.
+_SNIPPET_BONUS_SCORERS: dict[str, Callable[[str, str], int]] = {
+    **{key: _component_snippet_bonus for key in COMPONENT_FIELD_KEYS},
+    **{key: _billing_snippet_bonus for key in ("total", "billingan", "rekap_billingan", "kasir", "balance")},
+    **{
+        key: _timestamp_snippet_bonus
+        for key in ("waktu_mulai", "waktu_selesai", "waktu_mulai_koding", "waktu_selesai_koding")
+    },
+    **{key: _koding_snippet_bonus for key in ("koding", "total_koding")},
+    "link_e_klaim": _link_snippet_bonus,
+}
+
+
+# Payload building, context ranking and AI field analysis re-score the same
+# (key, snippet) pairs; scores depend only on the pair, so they are shared.
+@lru_cache(maxsize=4096)
 def _score_snippet_for_key(key: str, snippet: str) -> int:
     """Score how relevant a snippet is for a payload key."""
     normalized = _squash_whitespace(snippet)
@@ -1712,46 +2082,17 @@ def _score_snippet_for_key(key: str, snippet: str) -> int:
 
     upper = normalized.upper()
     score = 0
-    keyword_map = _payload_keyword_map()
-    keywords = keyword_map.get(key, ())
+    keywords = _PAYLOAD_KEYWORD_MAP.get(key, ())
 
     for keyword in keywords:
         if keyword in upper:
             score += 2 if len(keyword) >= 6 else 1
 
-    if key in COMPONENT_FIELD_KEYS:
-        if re.search(r"\bRP\.?\s*\d", upper):
-            score += 1
-
-    if key in {"total", "billingan", "rekap_billingan", "kasir", "balance"}:
-        if re.search(r"\bTOTAL\s*TAGIHAN\b", upper):
-            score += 3
-        if re.search(r"\bRP\.?\s*\d", upper):
-            score += 2
-        if "SISA PEMBAYARAN" in upper or "TOTAL BAYAR" in upper:
-            score += 2
-        if "PENJAMIN" in upper:
-            score += 1
-
-    if key in {"waktu_mulai", "waktu_selesai", "waktu_mulai_koding", "waktu_selesai_koding"}:
-        if re.search(r"\b(?:\d{1,2}[\/\.-]\d{1,2}[\/\.-]\d{2,4})\b", normalized):
-            score += 2
-        if re.search(r"\b\d{1,2}[:\.]\d{2}(?::\d{2})?\b", normalized):
-            score += 1
-
-    if key in {"koding", "total_koding"}:
-        if re.search(r"\bINA-?CBG\b|\bICD\b|\bGROUPING\b", upper):
-            score += 3
-
-    if key == "link_e_klaim":
-        if re.search(r"https?://", normalized, flags=re.IGNORECASE):
-            score += 4
-        if "E-KLAIM" in upper or "EKLAIM" in upper:
-            score += 2
-
-    for noise_pattern in _GENERIC_NOISE_PATTERNS:
-        if re.search(noise_pattern, upper):
-            score -= 1
+    bonus_scorer = _SNIPPET_BONUS_SCORERS.get(key)
+    if bonus_scorer is not None:
+        score += bonus_scorer(normalized, upper)
+
+    score -= len({match.lastindex for match in _GENERIC_NOISE_PATTERN.finditer(upper)})
 
     if len(normalized) > PAYLOAD_SNIPPET_MAX_CHARS:
         score -= 1
@@ -1797,26 +2138,31 @@ def _is_plausible_snippet_amount(key: str, snippet: str, total_tagihan_int: Opti
     return amount <= cap
 
 
+def _find_urls(text: str) -> list[str]:
+    """Return unique http(s) URLs in document order, trailing punctuation trimmed."""
+    return list(dict.fromkeys(url.rstrip(".,);]") for url in _URL_PATTERN.findall(text)))
+
+
 def extract_keyword_context_payload(
     text: str,
     *,
     window: int = 0,
     max_hits_per_key: int = 8,
+    urls: Optional[list[str]] = None,
+    line_index: Optional[_PayloadLineIndex] = None,
 ) -> dict[str, list[str]]:
     """Collect contextual snippets around keyword hits for each payload key."""
-    lines = [_squash_whitespace(line) for line in text.splitlines() if line.strip()]
-    upper_lines = [line.upper() for line in lines]
+    lines, _, line_keys = line_index if line_index is not None else _payload_line_index(text)
 
     contexts: dict[str, list[str]] = {key: [] for key in OCR_PAYLOAD_KEYS}
     if not lines:
         return contexts
 
-    keyword_map = _payload_keyword_map()
-    for key, keywords in keyword_map.items():
+    for key in _PAYLOAD_KEYWORD_MAP:
         seen: set[str] = set()
         snippets: list[str] = []
-        for index, upper_line in enumerate(upper_lines):
-            if not any(keyword in upper_line for keyword in keywords):
+        for index, matched_keys in enumerate(line_keys):
+            if key not in matched_keys:
                 continue
 
             start = max(0, index - window)
@@ -1834,11 +2180,10 @@ def extract_keyword_context_payload(
 
         contexts[key] = snippets
 
-    urls = re.findall(r"https?://[^\s]+", text, flags=re.IGNORECASE)
-    for url in urls:
-        cleaned_url = url.rstrip(".,);]")
-        if cleaned_url and cleaned_url not in contexts["link_e_klaim"]:
-            contexts["link_e_klaim"].append(cleaned_url)
+    link_contexts = contexts["link_e_klaim"]
+    for url in urls if urls is not None else _find_urls(text):
+        if url not in link_contexts:
+            link_contexts.append(url)
 
     return contexts
 
@@ -1850,11 +2195,19 @@ def extract_ocr_payload(
     total_tagihan_int: Optional[int],
     komponen_billing: dict[str, dict[str, object]],
     keyword_context: Optional[dict[str, list[str]]] = None,
+    urls: Optional[list[str]] = None,
+    line_index: Optional[_PayloadLineIndex] = None,
 ) -> dict[str, str]:
     """Extract broad related text snippets for downstream AI post-processing."""
-    payload = create_empty_ocr_payload()
-    lines = [_squash_whitespace(line) for line in text.splitlines() if line.strip()]
-    upper_lines = [line.upper() for line in lines]
+    payload: dict[str, dict[str, None]] = {key: {} for key in OCR_PAYLOAD_KEYS}
+    if line_index is None:
+        line_index = _payload_line_index(text)
+    lines, upper_lines, line_keys = line_index
+
+    def passes_evidence(key: str, snippet: str) -> bool:
+        if _score_snippet_for_key(key, snippet) < _EVIDENCE_MIN_SCORE.get(key, 1):
+            return False
+        return _is_plausible_snippet_amount(key, snippet, total_tagihan_int)
 
     for component_key in COMPONENT_FIELD_KEYS:
         component = komponen_billing.get(component_key, {})
@@ -1867,61 +2220,75 @@ def extract_ocr_payload(
         _append_payload_text(payload, "total", total_tagihan_raw)
         _append_payload_text(payload, "billingan", total_tagihan_raw)
 
-    field_patterns = _payload_keyword_map()
 
-    for index, upper_line in enumerate(upper_lines):
+    for index, matched_keys in enumerate(line_keys):
+        if not matched_keys:
+            continue
         line = lines[index]
-        for key, patterns in field_patterns.items():
-            if any(pattern in upper_line for pattern in patterns):
-                if (
-                    _score_snippet_for_key(key, line) >= _EVIDENCE_MIN_SCORE.get(key, 1)
-                    and _is_plausible_snippet_amount(key, line, total_tagihan_int)
-                ):
+        for key in _PAYLOAD_KEYWORD_MAP:
+            if key in matched_keys:
+                if passes_evidence(key, line):
                     _append_payload_text(payload, key, line)
                 if key in {"billingan", "rekap_billingan", "koding"} and index + 1 < len(lines):
                     next_line = lines[index + 1]
-                    if (
-                        _score_snippet_for_key(key, next_line) >= _EVIDENCE_MIN_SCORE.get(key, 1)
-                        and _is_plausible_snippet_amount(key, next_line, total_tagihan_int)
-                    ):
+                    if passes_evidence(key, next_line):
                         _append_payload_text(payload, key, next_line)
 
-    contexts = keyword_context if keyword_context is not None else extract_keyword_context_payload(text)
+    if urls is None:
+        urls = _find_urls(text)
+    contexts = (
+        keyword_context
+        if keyword_context is not None
+        else extract_keyword_context_payload(text, urls=urls, line_index=line_index)
+    )
     for key in OCR_PAYLOAD_KEYS:
         ranked_contexts = _rank_evidence_for_key(key, contexts.get(key, []), max_items=8)
         for snippet in ranked_contexts:
             if _is_plausible_snippet_amount(key, snippet, total_tagihan_int):
                 _append_payload_text(payload, key, snippet)
 
-    urls = re.findall(r"https?://[^\s]+", text, flags=re.IGNORECASE)
     for url in urls:
-        _append_payload_text(payload, "link_e_klaim", url.rstrip(".,);]"))
+        _append_payload_text(payload, "link_e_klaim", url)
 
     if not payload["link_e_klaim"]:
         for index, upper_line in enumerate(upper_lines):
             if "E-KLAIM" in upper_line or "EKLAIM" in upper_line:
                 _append_payload_text(payload, "link_e_klaim", lines[index])
 
-    return payload
+    return {key: " | ".join(parts) for key, parts in payload.items()}
+
+
+def _find_lunas_context(text: str) -> Optional[str]:
+    """Return the text window around the first LUNAS word, or None.
+
+    Equivalent to `(?is).{0,40}\\bLUNAS\\b.{0,60}` without its per-position
+    backtracking: the window starts 40 chars before the first hit and ends
+    60 chars after the last hit that still fits within that 40-char lead.
+    """
+    window_start: Optional[int] = None
+    last_end = 0
+    for match in _LUNAS_WORD_PATTERN.finditer(text):
+        if window_start is None:
+            window_start = max(0, match.start() - 40)
+        elif match.start() > window_start + 40:
+            break
+        last_end = match.end()
+    if window_start is None:
+        return None
+    return text[window_start : min(len(text), last_end + 60)]
 
 
 def _infer_balance(text: str) -> tuple[Optional[str], list[str]]:
     """Infer billing balance status from free-form text when explicit field is missing."""
-    lunas_match = re.search(r"(?is).{0,40}\bLUNAS\b.{0,60}", text)
-    if lunas_match:
-        return "lunas", [_squash_whitespace(lunas_match.group(0))]
+    lunas_context = _find_lunas_context(text)
+    if lunas_context is not None:
+        return "lunas", [_squash_whitespace(lunas_context)]
 
-    match = re.search(
-        r"(?is)SISA\s*PEMBAYARAN.{0,40}(?:RP\.?\s*)?0(?:[.,]0+)?\b",
-        text,
-    )
+    match = _SISA_PEMBAYARAN_ZERO_PATTERN.search(text)
     if match:
         return "lunas", [_squash_whitespace(match.group(0))]
 
-    match = re.search(
-        r"(?is)TOTAL\s*BAYAR(?:/|\s+)?\s*TUNAI.{0,30}(?:RP\.?\s*)?0(?:[.,]0+)?\b",
-        text,
-    )
+    match = _TOTAL_BAYAR_TUNAI_ZERO_PATTERN.search(text)
     if match:
         return "lunas", [_squash_whitespace(match.group(0))]
 
@@ -1931,8 +2298,8 @@ def _infer_balance(text: str) -> tuple[Optional[str], list[str]]:
 def detect_episode_type(text: str) -> str:
     """Classify episode type as ranap/rajal when signals are clear."""
     upper = text.upper()
-    explicit_ranap = bool(re.search(r"\bRAWAT\s+INAP\b", upper))
-    explicit_rajal = bool(re.search(r"\bRAWAT\s+JALAN\b", upper))
+    explicit_ranap = bool(_RAWAT_INAP_PATTERN.search(upper))
+    explicit_rajal = bool(_RAWAT_JALAN_PATTERN.search(upper))
     if explicit_ranap and not explicit_rajal:
         return "ranap"
     if explicit_rajal and not explicit_ranap:
@@ -1941,9 +2308,9 @@ def detect_episode_type(text: str) -> str:
     ranap_score = _count_profile_markers(text, "ranap")
     rajal_score = _count_profile_markers(text, "rajal")
 
-    if re.search(r"\bICU\b|\bNICU\b|\bHCU\b|\bVISITE\b", upper):
+    if _RANAP_HINT_PATTERN.search(upper):
         ranap_score += 1
-    if re.search(r"\bPOLI\b|\bPOLIKLINIK\b|\bKONSULTASI\b", upper):
+    if _RAJAL_HINT_PATTERN.search(upper):
         rajal_score += 1
 
     if ranap_score >= rajal_score + 2:
@@ -2036,7 +2403,7 @@ def build_ai_field_analysis(
                 status = "inferred"
 
         if not value and key == "link_e_klaim":
-            mention = re.search(r"(?is)\bE-?KLAIM\b.{0,80}", text)
+            mention = _EKLAIM_MENTION_PATTERN.search(text)
             if mention:
                 value = "referensi e-klaim tanpa URL"
                 evidence = [_squash_whitespace(mention.group(0))]
@@ -2069,25 +2436,15 @@ def _build_document_validation(
     komponen_billing: dict[str, dict[str, object]],
     ai_field_analysis: dict[str, dict[str, object]],
     extraction_diagnostics: Optional[dict[str, object]],
+    lines: Optional[tuple[str, ...]] = None,
 ) -> dict[str, object]:
     """Summarize whether OCR output is usable and document looks like billing."""
     component_hits = _component_hit_count(komponen_billing)
-    marker_patterns = (
-        r"\bRINCIAN\s+BIAYA\b",
-        r"\bTOTAL\s+TAGIHAN\b",
-        r"\bNO\.?\s*TAGIHAN\b",
-        r"\bNO\.?\s*REKAM\s*MEDIS\b",
-        r"\bUNIT\s+LAYANAN\b",
-        r"\bLABORATORIUM\b",
-        r"\bRADIOLOGI\b",
-        r"\bFARMASI\b",
-        r"\bKASIR\b",
-    )
-    marker_hits = sum(1 for pattern in marker_patterns if re.search(pattern, text, flags=re.IGNORECASE))
-    rupiah_hits = len(re.findall(r"(?i)\bRP\.?\s*\d", text))
-    date_hits = len(re.findall(r"\b\d{1,2}[\/\.-]\d{1,2}[\/\.-]\d{2,4}\b", text))
+    marker_hits = sum(1 for pattern in _QUALITY_MARKER_PATTERNS if pattern.search(text))
+    rupiah_hits = len(_RUPIAH_DIGIT_PATTERN.findall(text))
+    date_hits = len(_DATE_PATTERN.findall(text))
 
-    compact = re.sub(r"\s+", "", text)
+    compact = _WHITESPACE_PATTERN.sub("", text)
     noisy_chars = sum(1 for char in compact if char in "{}[]|`~^_")
     noise_ratio = noisy_chars / max(1, len(compact))
 
@@ -2095,7 +2452,7 @@ def _build_document_validation(
     has_total = isinstance(total_tagihan_int, int)
     has_billing_field = ai_field_analysis.get("billingan", {}).get("status") in {"found", "inferred"}
     component_amount_total = _sum_component_amounts(komponen_billing)
-    total_candidates = _collect_total_candidates(text)
+    total_candidates = _collect_total_candidates(text, lines=lines)
     conflicting_total_candidates = [
         value
         for value in total_candidates
@@ -2277,6 +2634,7 @@ def build_ai_bundle(
     keyword_context: dict[str, list[str]],
     raw_source_text: Optional[str] = None,
     extraction_diagnostics: Optional[dict[str, object]] = None,
+    lines: Optional[tuple[str, ...]] = None,
 ) -> dict[str, object]:
     """Build a single AI-ready package containing all extracted context."""
     bundle_text = raw_source_text if isinstance(raw_source_text, str) and raw_source_text else text
@@ -2289,6 +2647,7 @@ def build_ai_bundle(
         komponen_billing=komponen_billing,
         ai_field_analysis=ai_field_analysis,
         extraction_diagnostics=extraction_diagnostics,
+        lines=lines,
     )
     bundle = {
         "schema_version": "v2",
@@ -2328,66 +2687,145 @@ def build_ai_bundle(
 
 def is_text_too_short(text: str, min_non_space_chars: int = 40) -> bool:
     """Return True when extracted text is likely empty/truncated."""
-    cleaned = re.sub(r"\s+", "", text)
-    return len(cleaned) < min_non_space_chars
+    return _count_non_space_chars(text) < min_non_space_chars
+
+
+def _use_parallel_page_text(page_count: int) -> bool:
+    """Return True when page text extraction should fan out to worker processes."""
+    return PDF_TEXT_WORKERS > 1 and page_count >= PDF_TEXT_PARALLEL_MIN_PAGES
+
+
+_PAGE_TEXT_POOL: Optional[ProcessPoolExecutor] = None
+_PAGE_TEXT_POOL_LOCK = threading.Lock()
+
 
+def _page_text_pool() -> ProcessPoolExecutor:
+    """Return the shared page-text process pool, starting it on first use.
 
-def _extract_text_via_pdfplumber(pdf_bytes: bytes) -> str:
-    """Extract machine-readable text from PDF pages using pdfplumber."""
+    Spawned workers take seconds to import pdfplumber and PyMuPDF, so one pool
+    of PDF_TEXT_WORKERS processes is kept for the life of the app.
+    """
+    global _PAGE_TEXT_POOL
+    with _PAGE_TEXT_POOL_LOCK:
+        if _PAGE_TEXT_POOL is None:
+            # Spawn instead of fork: extraction runs inside the API's worker threads.
+            _PAGE_TEXT_POOL = ProcessPoolExecutor(
+                max_workers=PDF_TEXT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _PAGE_TEXT_POOL
+
+
+def shutdown_page_text_pool() -> None:
+    """Stop the shared page-text process pool, if it was started (app shutdown)."""
+    global _PAGE_TEXT_POOL
+    with _PAGE_TEXT_POOL_LOCK:
+        pool, _PAGE_TEXT_POOL = _PAGE_TEXT_POOL, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _extract_page_texts_in_processes(
+    page_range_extractor: Callable[[bytes, int, int], list[str]],
+    pdf_bytes: bytes,
+    page_count: int,
+) -> list[str]:
+    """Split pages into contiguous ranges and extract each range in its own process.
+
+    Neither PyMuPDF (not thread-safe) nor pdfplumber (pure Python) gains from
+    threads, so every worker opens its own copy of the document instead.
+    """
+    global _PAGE_TEXT_POOL
+    workers = min(PDF_TEXT_WORKERS, page_count)
+    chunk_size = -(-page_count // workers)
+    starts = list(range(0, page_count, chunk_size))
+    stops = [min(start + chunk_size, page_count) for start in starts]
+    pool = _page_text_pool()
+    try:
+        chunks = pool.map(page_range_extractor, [pdf_bytes] * len(starts), starts, stops)
+        return [page_text for chunk in chunks for page_text in chunk]
+    except BrokenProcessPool:
+        # A crashed worker breaks the whole pool; let the next call start a fresh one.
+        with _PAGE_TEXT_POOL_LOCK:
+            if _PAGE_TEXT_POOL is pool:
+                _PAGE_TEXT_POOL = None
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+
+
+def _pdfplumber_page_range_texts(pdf_bytes: bytes, start: int, stop: int) -> list[str]:
+    """Extract pdfplumber text for pages `start..stop-1` (process-pool worker)."""
+    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+        return [page.extract_text() or "" for page in pdf.pages[start:stop]]
+
+
+def _pymupdf_page_range_texts(pdf_bytes: bytes, start: int, stop: int) -> list[str]:
+    """Extract PyMuPDF text for pages `start..stop-1` (process-pool worker)."""
+    import fitz  # type: ignore[import-not-found]
+
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as pdf:
+        return [pdf.load_page(index).get_text("text") or "" for index in range(start, stop)]
+
+
+def _join_page_texts(page_texts: list[str]) -> str:
+    """Join non-blank page texts into one document text."""
+    return "\n".join(page_text for page_text in page_texts if page_text.strip()).strip()
+
+
+def _pdfplumber_page_texts(pdf_bytes: bytes) -> list[str]:
+    """Return pdfplumber text for every page, blank pages included."""
     try:
         with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-            page_texts = []
-            for page in pdf.pages:
-                page_text = page.extract_text() or ""
-                if page_text.strip():
-                    page_texts.append(page_text)
+            page_count = len(pdf.pages)
+            parallel = _use_parallel_page_text(page_count)
+            raw_page_texts = [] if parallel else [page.extract_text() or "" for page in pdf.pages]
+        if parallel:
+            raw_page_texts = _extract_page_texts_in_processes(_pdfplumber_page_range_texts, pdf_bytes, page_count)
     except Exception as exc:
         raise PDFTextExtractionError(f"Tidak bisa membaca isi PDF: {exc}") from exc
 
-    return "\n".join(page_texts).strip()
+    return raw_page_texts
 
 
-def _extract_text_via_pymupdf(pdf_bytes: bytes) -> str:
-    """Extract machine-readable text from PDF pages using PyMuPDF."""
+def _pymupdf_page_texts(pdf_bytes: bytes) -> list[str]:
+    """Return PyMuPDF text for every page, or an empty list when unavailable."""
     try:
         import fitz  # type: ignore[import-not-found]
     except Exception:
-        return ""
+        return []
 
     try:
-        page_texts: list[str] = []
         with fitz.open(stream=pdf_bytes, filetype="pdf") as pdf:
-            for page in pdf:
-                page_text = page.get_text("text") or ""
-                if page_text.strip():
-                    page_texts.append(page_text)
+            page_count = len(pdf)
+            parallel = _use_parallel_page_text(page_count)
+            raw_page_texts = [] if parallel else [page.get_text("text") or "" for page in pdf]
+        if parallel:
+            raw_page_texts = _extract_page_texts_in_processes(_pymupdf_page_range_texts, pdf_bytes, page_count)
     except Exception:
-        return ""
+        return []
 
-    return "\n".join(page_texts).strip()
+    return raw_page_texts
 
 
 def _merge_text_sources(*sources: str) -> str:
     """Merge multiple OCR/text sources while deduplicating repeated lines."""
-    seen: set[str] = set()
-    merged_lines: list[str] = []
-    for source in sources:
-        if not source:
-            continue
-        for line in source.splitlines():
-            normalized = _squash_whitespace(line)
-            if not normalized or normalized in seen:
-                continue
-            seen.add(normalized)
-            merged_lines.append(normalized)
-    return "\n".join(merged_lines).strip()
+    normalized_lines = (
+        _squash_whitespace(line)
+        for source in sources
+        if source
+        for line in source.splitlines()
+        if line and not line.isspace()
+    )
+    return "\n".join(dict.fromkeys(normalized_lines))
 
 
 def _needs_ocr_enrichment(text: str) -> bool:
     """Decide whether OCR should be used to enrich extracted text."""
     if OCR_ENRICH_ALWAYS:
         return True
-    if is_text_too_short(text):
+    # Same threshold as is_text_too_short; the count is reused by the rich-text rule below.
+    non_space_chars = _count_non_space_chars(text)
+    if non_space_chars < 40:
         return True
 
     upper = text.upper()
@@ -2403,19 +2841,81 @@ def _needs_ocr_enrichment(text: str) -> bool:
     marker_hits = sum(1 for marker in critical_markers if marker in upper)
     if marker_hits >= 2:
         return False
+    # Long machine text with a billing header is a text-born PDF; OCR would only re-read it.
+    if non_space_chars >= OCR_RICH_TEXT_MIN_CHARS and (
+        "TOTAL TAGIHAN" in upper or "RINCIAN BIAYA" in upper
+    ):
+        return False
 
     return True
 
 
-def _extract_text_via_ocr(pdf_bytes: bytes) -> tuple[str, list[str]]:
-    """OCR fallback for image-based PDFs."""
+def _sparse_ocr_page_indices(*page_text_sources: list[str]) -> Optional[list[int]]:
+    """Return pages without usable machine text when the PDF also has text-rich pages.
+
+    Mixed PDFs (typed billing pages plus scanned attachments) only need OCR on
+    the sparse pages. A page counts as covered only when one source has at
+    least OCR_SPARSE_PAGE_CHARS characters and an amount marker, so a scanned
+    bill with a typed header or footer is still OCR'd. None means no
+    page-level restriction applies.
+    """
+    if OCR_ENRICH_ALWAYS:
+        return None
+    page_count = max((len(page_texts) for page_texts in page_text_sources), default=0)
+    sparse_pages = [
+        index
+        for index in range(page_count)
+        if not any(
+            _count_non_space_chars(page_texts[index]) >= OCR_SPARSE_PAGE_CHARS
+            and _PAGE_AMOUNT_MARKER_PATTERN.search(page_texts[index])
+            for page_texts in page_text_sources
+            if index < len(page_texts)
+        )
+    ]
+    if not sparse_pages or len(sparse_pages) == page_count:
+        return None
+    return sparse_pages
+
+
+# Target pages are OCR'd totals-first; once these markers have all been read,
+# OCR_EARLY_STOP skips the remaining pages.
+_OCR_EARLY_STOP_MARKERS = ("TOTAL TAGIHAN", "NAMA")
+
+
+def _tesseract_recognizer() -> Optional[Callable[[object, str, int], str]]:
+    """Return an `(image, lang, psm) -> text` OCR callable, or None without pytesseract.
+
+    Recognition errors yield "" so callers treat them like an empty candidate.
+    """
     try:
-        import fitz  # type: ignore[import-not-found]
         import pytesseract  # type: ignore[import-not-found]
+    except Exception:
+        return None
+
+    def recognize_with_cli(image: object, lang: str, psm: int) -> str:
+        try:
+            return pytesseract.image_to_string(image, lang=lang, config=f"--oem 1 --psm {psm}")
+        except pytesseract.TesseractError:
+            return ""
+
+    return recognize_with_cli
+
+
+def _extract_text_via_ocr(
+    pdf_bytes: bytes,
+    page_indices: Optional[list[int]] = None,
+) -> tuple[str, list[str]]:
+    """OCR fallback for image-based PDFs, optionally limited to specific pages."""
+    try:
+        import fitz  # type: ignore[import-not-found]
         from PIL import Image, ImageFilter, ImageOps
     except Exception:
         return "", []
 
+    recognize = _tesseract_recognizer()
+    if recognize is None:
+        return "", []
+
     def close_images(images: list[object]) -> None:
         """Close PIL images safely while avoiding duplicate closes."""
         seen: set[int] = set()
@@ -2430,15 +2930,24 @@ def _extract_text_via_ocr(pdf_bytes: bytes) -> tuple[str, list[str]]:
                 continue
 
     def target_page_indices(page_count: int) -> list[int]:
-        """Prioritize likely pages containing identity, totals, and components."""
+        """Prioritize likely pages containing identity, totals, and components.
+
+        Requested pages (sparse pages of mixed PDFs) get the same order as a
+        whole document, applied to positions within the requested subset.
+        """
         if OCR_ENRICH_ALWAYS:
             return list(range(page_count))
+        if page_indices is not None:
+            pages = [index for index in page_indices if 0 <= index < page_count]
+        else:
+            pages = list(range(page_count))
 
-        middle = page_count // 2
+        count = len(pages)
+        middle = count // 2
         candidates = [
-            page_count - 1,
-            page_count - 2,
-            page_count - 3,
+            count - 1,
+            count - 2,
+            count - 3,
             0,
             middle,
             1,
@@ -2447,23 +2956,15 @@ def _extract_text_via_ocr(pdf_bytes: bytes) -> tuple[str, list[str]]:
             2,
         ]
         selected: list[int] = []
-        page_limit = page_count if OCR_MAX_PAGES <= 0 else min(OCR_MAX_PAGES, page_count)
-        for index in candidates:
-            if index < 0 or index >= page_count:
-                continue
-            if index in selected:
-                continue
-            selected.append(index)
+        page_limit = count if OCR_MAX_PAGES <= 0 else min(OCR_MAX_PAGES, count)
+        for position in [*candidates, *range(count)]:
             if len(selected) >= page_limit:
                 break
-
-        if len(selected) < page_limit:
-            for index in range(page_count):
-                if index in selected:
-                    continue
-                selected.append(index)
-                if len(selected) >= page_limit:
-                    break
+            if position < 0 or position >= count:
+                continue
+            if pages[position] in selected:
+                continue
+            selected.append(pages[position])
 
         return selected
 
@@ -2498,15 +2999,7 @@ def _extract_text_via_ocr(pdf_bytes: bytes) -> tuple[str, list[str]]:
                         crop_text = ""
                         crop_score = -1
                         for lang in (OCR_LANG_PRIMARY, OCR_LANG_FALLBACK):
-                            try:
-                                candidate = pytesseract.image_to_string(
-                                    crop,
-                                    lang=lang,
-                                    config=f"--oem 1 --psm {psm}",
-                                )
-                            except pytesseract.TesseractError:
-                                continue
-
+                            candidate = recognize(crop, lang, psm)
                             if not candidate or not candidate.strip():
                                 continue
 
@@ -2524,7 +3017,7 @@ def _extract_text_via_ocr(pdf_bytes: bytes) -> tuple[str, list[str]]:
                             continue
 
                         token_count = len(extracted.split())
-                        alpha_count = sum(1 for char in extracted if "A" <= char <= "Z")
+                        alpha_count = _count_ascii_uppercase(extracted)
                         score = (token_count, alpha_count)
                         if score > best_score:
                             best_score = score
@@ -2541,78 +3034,121 @@ def _extract_text_via_ocr(pdf_bytes: bytes) -> tuple[str, list[str]]:
 
         return best_name
 
-    page_texts: list[tuple[int, str]] = []
-    name_hints: list[str] = []
-    tesseract_config = f"--oem 1 --psm {OCR_PSM}"
-    try:
-        with fitz.open(stream=pdf_bytes, filetype="pdf") as pdf:
-            for page_index in target_page_indices(len(pdf)):
-                page = pdf.load_page(page_index)
-                pix = page.get_pixmap(
-                    matrix=fitz.Matrix(OCR_ZOOM, OCR_ZOOM),
-                    colorspace=fitz.csGRAY,
-                    alpha=False,
-                )
-                image = Image.frombytes("L", (pix.width, pix.height), pix.samples)
-                variant_images: list[object] = [image]
-
-                name_hint_images: list[object] = [image]
-                if OCR_MULTI_PASS:
-                    enhanced = ImageOps.autocontrast(image, cutoff=2)
-                    sharpened = enhanced.filter(ImageFilter.SHARPEN)
-                    binary = enhanced.point(lambda px: 255 if px >= OCR_BINARIZE_THRESHOLD else 0)
-                    variant_images.extend([enhanced, sharpened, binary])
-                    name_hint_images.append(enhanced)
-
-                ocr_text: Optional[str] = None
-                ocr_score = -1
-                accepted = False
-                for variant in variant_images:
-                    for lang in (OCR_LANG_PRIMARY, OCR_LANG_FALLBACK):
-                        try:
-                            candidate = pytesseract.image_to_string(
-                                variant,
-                                lang=lang,
-                                config=tesseract_config,
-                            )
-                        except pytesseract.TesseractNotFoundError:
-                            close_images(variant_images)
-                            return "", []
-                        except pytesseract.TesseractError:
-                            continue
-
-                        if not candidate or not candidate.strip():
-                            continue
-
-                        candidate_score = _score_ocr_candidate(candidate)
-                        if candidate_score > ocr_score:
-                            ocr_score = candidate_score
-                            ocr_text = candidate
-
-                        if candidate_score >= OCR_PAGE_ACCEPT_SCORE:
-                            accepted = True
-                            break
-                    if accepted:
+    def ocr_page(page_index: int, image: object) -> tuple[int, Optional[str], Optional[str]]:
+        """OCR one rendered page, returning its best text and optional name hint."""
+        variant_images: list[object] = [image]
+        try:
+            name_hint_images: list[object] = [image]
+            if OCR_MULTI_PASS:
+                enhanced = ImageOps.autocontrast(image, cutoff=2)
+                sharpened = enhanced.filter(ImageFilter.SHARPEN)
+                binary = enhanced.point(lambda px: 255 if px >= OCR_BINARIZE_THRESHOLD else 0)
+                variant_images.extend([enhanced, sharpened, binary])
+                name_hint_images.append(enhanced)
+
+            ocr_text: Optional[str] = None
+            ocr_score = -1
+            accepted = False
+            for variant in variant_images:
+                for lang in (OCR_LANG_PRIMARY, OCR_LANG_FALLBACK):
+                    candidate = recognize(variant, lang, OCR_PSM)
+                    if not candidate or not candidate.strip():
+                        continue
+
+                    candidate_score = _score_ocr_candidate(candidate)
+                    if candidate_score > ocr_score:
+                        ocr_score = candidate_score
+                        ocr_text = candidate
+
+                    if candidate_score >= OCR_PAGE_ACCEPT_SCORE:
+                        accepted = True
                         break
+                if accepted:
+                    break
 
-                should_probe_name = bool(
-                    ocr_text
-                    and any(
-                        marker in ocr_text.upper()
-                        for marker in ("NAMA", "RINCIAN BIAYA", "NO. TAGIHAN")
-                    )
+            should_probe_name = bool(
+                ocr_text
+                and any(
+                    marker in ocr_text.upper()
+                    for marker in ("NAMA", "RINCIAN BIAYA", "NO. TAGIHAN")
                 )
-                name_hint = extract_name_hint(name_hint_images) if should_probe_name else None
-                if name_hint:
-                    name_hints.append(name_hint)
-
-                close_images(variant_images)
-                del pix
+            )
+            name_hint = extract_name_hint(name_hint_images) if should_probe_name else None
+            return page_index, ocr_text, name_hint
+        finally:
+            close_images(variant_images)
+
+    rendered_any_page = False
+
+    def render_pages(pdf: object) -> Iterator[tuple[int, object]]:
+        """Render target pages to grayscale images on the calling thread."""
+        nonlocal rendered_any_page
+        default_matrix = fitz.Matrix(OCR_ZOOM, OCR_ZOOM)
+        for page_index in target_page_indices(len(pdf)):  # type: ignore[arg-type]
+            page = pdf.load_page(page_index)  # type: ignore[attr-defined]
+            # Oversized pages (large media boxes, high-DPI scans) are rendered at a
+            # lower zoom so the bitmap never exceeds OCR_MAX_RENDER_WIDTH pixels.
+            page_width = page.rect.width
+            if page_width > 0 and page_width * OCR_ZOOM > OCR_MAX_RENDER_WIDTH:
+                zoom = OCR_MAX_RENDER_WIDTH / page_width
+                matrix = fitz.Matrix(zoom, zoom)
+            else:
+                matrix = default_matrix
+            pix = page.get_pixmap(matrix=matrix, colorspace=fitz.csGRAY, alpha=False)
+            rendered_any_page = True
+            # Wrap the samples bytes without a second copy; the image keeps the buffer alive.
+            image = Image.frombuffer("L", (pix.width, pix.height), pix.samples, "raw", "L", pix.stride, 1)
+            del pix
+            yield page_index, image
+
+    found_markers: set[str] = set()
+
+    def has_enough_signal(page_result: tuple[int, Optional[str], Optional[str]]) -> bool:
+        """With OCR_EARLY_STOP, return True once every early-stop marker has been OCR'd."""
+        if not OCR_EARLY_STOP:
+            return False
+        _, ocr_text, _ = page_result
+        if ocr_text:
+            upper = ocr_text.upper()
+            found_markers.update(marker for marker in _OCR_EARLY_STOP_MARKERS if marker in upper)
+        return len(found_markers) == len(_OCR_EARLY_STOP_MARKERS)
 
-                if ocr_text:
-                    page_texts.append((page_index, ocr_text.strip()))
+    page_results: list[tuple[int, Optional[str], Optional[str]]] = []
+    try:
+        with fitz.open(stream=pdf_bytes, filetype="pdf") as pdf:
+            if OCR_PAGE_WORKERS <= 1:
+                for page_index, image in render_pages(pdf):
+                    page_results.append(ocr_page(page_index, image))
+                    if has_enough_signal(page_results[-1]):
+                        break
+            else:
+                # PyMuPDF is not thread-safe, so only the tesseract calls (separate
+                # processes) run in the pool; rendering stays on this thread and is
+                # throttled so at most two pages per worker wait in memory.
+                with ThreadPoolExecutor(max_workers=OCR_PAGE_WORKERS) as executor:
+                    pending: deque[Future[tuple[int, Optional[str], Optional[str]]]] = deque()
+                    stop = False
+                    for page_index, image in render_pages(pdf):
+                        while pending and (len(pending) >= OCR_PAGE_WORKERS * 2 or pending[0].done()):
+                            page_results.append(pending.popleft().result())
+                            stop = has_enough_signal(page_results[-1]) or stop
+                        if stop:
+                            close_images([image])
+                            break
+                        pending.append(executor.submit(ocr_page, page_index, image))
+                    page_results.extend(future.result() for future in pending)
     except Exception:
         return "", []
+    finally:
+        # Rendering fills MuPDF's process-wide resource store (decoded images,
+        # fonts); release it so scanned PDFs do not pin that memory between
+        # requests. With concurrent extractions another thread may still be
+        # rendering from the store, so it is left to MuPDF's own limit then.
+        if rendered_any_page and OCR_CONCURRENCY == 1:
+            fitz.TOOLS.store_shrink(100)
+
+    page_texts = [(page_index, ocr_text.strip()) for page_index, ocr_text, _ in page_results if ocr_text]
+    name_hints = [name_hint for _, _, name_hint in page_results if name_hint]
 
     ordered_pages = [
         f"=== PAGE {page_index + 1} ===\n{page_text}"
@@ -2630,17 +3166,27 @@ def extract_text_from_pdf(pdf_bytes: bytes) -> TextExtractionResult:
     ocr_text = ""
     ocr_name_hints: list[str] = []
     ocr_attempted = False
+    primary_pages: list[str] = []
     try:
-        primary_text = _extract_text_via_pdfplumber(pdf_bytes)
+        primary_pages = _pdfplumber_page_texts(pdf_bytes)
     except PDFTextExtractionError as exc:
         extraction_error = exc
-
-    secondary_text = _extract_text_via_pymupdf(pdf_bytes)
+    primary_text = _join_page_texts(primary_pages)
+
+    # PyMuPDF only fills gaps: when pdfplumber text already has the billing
+    # markers OCR enrichment looks for, the second full parse is skipped.
+    secondary_pages: list[str] = []
+    if PDF_SECONDARY_TEXT_ALWAYS or _needs_ocr_enrichment(primary_text):
+        secondary_pages = _pymupdf_page_texts(pdf_bytes)
+    secondary_text = _join_page_texts(secondary_pages)
     merged_text = _merge_text_sources(primary_text, secondary_text)
 
     if _needs_ocr_enrichment(merged_text):
         ocr_attempted = True
-        ocr_text, ocr_name_hints = _extract_text_via_ocr(pdf_bytes)
+        ocr_text, ocr_name_hints = _extract_text_via_ocr(
+            pdf_bytes,
+            page_indices=_sparse_ocr_page_indices(primary_pages, secondary_pages),
+        )
         if ocr_text:
             merged_text = _merge_text_sources(merged_text, ocr_text)
         elif extraction_error is not None and not merged_text:
@@ -2663,7 +3209,7 @@ def parse_billing_text(
     extraction_diagnostics: Optional[dict[str, object]] = None,
 ) -> ParsedBillingFields:
     """Parse billing text into normalized name and total fields."""
-    base_focused_text = select_primary_billing_text(text)
+    base_focused_text, base_extraction = _select_primary_billing_segment(text)
     document_profile = detect_episode_type(base_focused_text)
     if document_profile == "unknown":
         document_profile = detect_episode_type(text)
@@ -2671,27 +3217,44 @@ def parse_billing_text(
     if not focused_text.strip():
         focused_text = base_focused_text
 
-    nama = (
-        _extract_name_hint_from_diagnostics(extraction_diagnostics)
-        or extract_nama(focused_text)
-        or extract_nama(base_focused_text)
-        or extract_nama(text)
-    )
-    total_tagihan_raw, total_tagihan_int = extract_total_tagihan(focused_text)
-    if total_tagihan_raw is None or total_tagihan_int is None:
-        fallback_raw, fallback_int = extract_total_tagihan(base_focused_text)
-        total_tagihan_raw = total_tagihan_raw or fallback_raw
-        total_tagihan_int = total_tagihan_int if total_tagihan_int is not None else fallback_int
-    if total_tagihan_raw is None or total_tagihan_int is None:
-        fallback_raw, fallback_int = extract_total_tagihan(text)
+    # Focused, base and full text are often the same string; each distinct text is
+    # extracted once, since repeating a fallback on the same text cannot add a field.
+    fallback_texts = list(dict.fromkeys((focused_text, base_focused_text, text)))
+
+    nama = _extract_name_hint_from_diagnostics(extraction_diagnostics)
+    for candidate_text in fallback_texts:
+        if nama:
+            break
+        nama = extract_nama(candidate_text)
+
+    focused_lines = _split_nonempty_lines(focused_text)
+    # Ranking already extracted the winning segment; reuse it when nothing narrowed it further.
+    reusable_extraction = base_extraction if focused_text == base_focused_text else None
+    if reusable_extraction is not None:
+        total_tagihan_raw = reusable_extraction.total_tagihan_raw
+        total_tagihan_int = reusable_extraction.total_tagihan_int
+    else:
+        total_tagihan_raw, total_tagihan_int = extract_total_tagihan(focused_text, lines=focused_lines)
+    for candidate_text in fallback_texts[1:]:
+        if total_tagihan_raw is not None and total_tagihan_int is not None:
+            break
+        fallback_raw, fallback_int = extract_total_tagihan(candidate_text)
         total_tagihan_raw = total_tagihan_raw or fallback_raw
         total_tagihan_int = total_tagihan_int if total_tagihan_int is not None else fallback_int
 
-    komponen_billing = extract_billing_components(focused_text, total_tagihan_int=total_tagihan_int)
+    if reusable_extraction is not None and reusable_extraction.total_tagihan_int == total_tagihan_int:
+        komponen_billing = reusable_extraction.komponen_billing
+    else:
+        komponen_billing = extract_billing_components(
+            focused_text,
+            total_tagihan_int=total_tagihan_int,
+            lines=focused_lines,
+        )
     _apply_component_fallbacks(
         focused_text,
         components=komponen_billing,
         total_tagihan_int=total_tagihan_int,
+        lines=focused_lines,
     )
     _apply_document_profile_to_components(
         komponen_billing,
@@ -2700,13 +3263,21 @@ def parse_billing_text(
     jenis_layanan = document_profile or detect_episode_type(focused_text)
     if jenis_layanan == "unknown":
         jenis_layanan = detect_episode_type(text)
-    keyword_context = extract_keyword_context_payload(focused_text)
+    focused_urls = _find_urls(focused_text)
+    focused_line_index = _payload_line_index(focused_text)
+    keyword_context = extract_keyword_context_payload(
+        focused_text,
+        urls=focused_urls,
+        line_index=focused_line_index,
+    )
     ocr_payload = extract_ocr_payload(
         focused_text,
         total_tagihan_raw=total_tagihan_raw,
         total_tagihan_int=total_tagihan_int,
         komponen_billing=komponen_billing,
         keyword_context=keyword_context,
+        urls=focused_urls,
+        line_index=focused_line_index,
     )
     ai_field_analysis = build_ai_field_analysis(
         focused_text,
@@ -2728,6 +3299,7 @@ def parse_billing_text(
         keyword_context=keyword_context,
         raw_source_text=text,
         extraction_diagnostics=extraction_diagnostics,
+        lines=focused_lines,
     )
 
     return ParsedBillingFields(
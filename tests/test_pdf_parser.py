@@ -2,9 +2,27 @@
 
 from __future__ import annotations
 
+from contextlib import ExitStack
+import importlib.util
+import sys
+import threading
+from types import SimpleNamespace
+from typing import Callable, Optional
 import unittest
-
-from app.services.pdf_parser import parse_billing_text
+from unittest import mock
+
+from app.services import pdf_parser
+from app.services.pdf_parser import (
+    _append_payload_text,
+    _find_lunas_context,
+    _find_urls,
+    _parse_rupiah_amount,
+    _score_snippet_for_key,
+    _sparse_ocr_page_indices,
+    create_empty_ocr_payload,
+    extract_total_tagihan,
+    parse_billing_text,
+)
 
 
 class ParseBillingSafetyTests(unittest.TestCase):
@@ -556,5 +574,267 @@ class ParseBillingSafetyTests(unittest.TestCase):
         self.assertEqual(35000, parsed.komponen_billing["prosedur_non_bedah"]["nilai_int"])
 
 
+class ParserHelperTests(unittest.TestCase):
+    """Pin helper semantics that the hot-path optimizations must preserve."""
+
+    def test_each_distinct_noise_label_lowers_snippet_score(self) -> None:
+        clean = _score_snippet_for_key("excel", "EXCEL rekap")
+        one_noise = _score_snippet_for_key("excel", "EXCEL rekap No. SEP 123")
+        two_noise = _score_snippet_for_key("excel", "EXCEL rekap No. SEP 123 No. Rekam 456 No. SEP 789")
+
+        self.assertEqual(clean - 1, one_noise)
+        self.assertEqual(clean - 2, two_noise)
+
+    def test_rupiah_amount_parsing_handles_separators_and_decimals(self) -> None:
+        self.assertEqual(225372, _parse_rupiah_amount("225,372"))
+        self.assertEqual(198000, _parse_rupiah_amount("198.000"))
+        self.assertEqual(244600, _parse_rupiah_amount("244.600,00"))
+        self.assertEqual(1234567, _parse_rupiah_amount("1 234 567"))
+        self.assertEqual(35000, _parse_rupiah_amount("35000"))
+        self.assertIsNone(_parse_rupiah_amount("  "))
+        self.assertIsNone(_parse_rupiah_amount(".,"))
+
+    def test_last_valid_total_tagihan_wins(self) -> None:
+        text = "\n".join(
+            [
+                "Total Tagihan Rp. 100.000",
+                "Farmasi",
+                "Total Tagihan Rp. 150.000",
+                "No. Tagihan 123456789",
+                "Total Tagihan 2506280015",
+            ]
+        )
+
+        self.assertEqual(("Total Tagihan Rp. 150.000", 150000), extract_total_tagihan(text))
+
+    def test_payload_dedup_keeps_snippets_containing_separator_whole(self) -> None:
+        payload: dict[str, dict[str, None]] = {"kasir": {}}
+        _append_payload_text(payload, "kasir", "Leche | oer Total Bayar / Tunai Rp. 0")
+        _append_payload_text(payload, "kasir", "Sisa Pembayaran Rp. 0")
+        _append_payload_text(payload, "kasir", "Leche  |  oer Total Bayar / Tunai Rp. 0")
+
+        self.assertEqual(
+            ["Leche | oer Total Bayar / Tunai Rp. 0", "Sisa Pembayaran Rp. 0"],
+            list(payload["kasir"]),
+        )
+
+    def test_only_sparse_pages_are_ocr_targets_in_mixed_pdfs(self) -> None:
+        rich_page = "Rincian Biaya Pelayanan Pasien Total Tagihan Rp. 225.372 Kasir"
+        plumber_pages = [rich_page, "", "  \n "]
+        pymupdf_pages = [rich_page, "", "Hal 3"]
+
+        self.assertEqual([1, 2], _sparse_ocr_page_indices(plumber_pages, pymupdf_pages))
+        typed_header = "RS Harapan Sehat Jl. Merdeka 1 Telp 021 555 Tanggal 12.05.2024 Halaman 2"
+        self.assertEqual([1], _sparse_ocr_page_indices([rich_page, typed_header, rich_page]))
+        self.assertIsNone(_sparse_ocr_page_indices(["", " "], ["", ""]))
+        self.assertIsNone(_sparse_ocr_page_indices([rich_page, rich_page], []))
+
+    def test_lunas_context_window_matches_bounded_regex_window(self) -> None:
+        both_hits = "Status LUNAS, kwitansi LUNAS " + "y" * 80
+        late_hit = "x" * 50 + "Status LUNAS dibayar " + "y" * 80
+
+        self.assertEqual(both_hits[:88], _find_lunas_context(both_hits))
+        self.assertEqual(late_hit[17:122], _find_lunas_context(late_hit))
+        self.assertIsNone(_find_lunas_context("PELUNASAN belum"))
+
+    def test_urls_are_trimmed_and_deduplicated_in_document_order(self) -> None:
+        text = "Link E-Klaim: https://eklaim.example.id/k/1. lihat (http://x.id/a); https://eklaim.example.id/k/1"
+
+        self.assertEqual(["https://eklaim.example.id/k/1", "http://x.id/a"], _find_urls(text))
+
+    def test_empty_ocr_payload_has_parsed_payload_keys(self) -> None:
+        parsed = parse_billing_text("Nama Pasien: BUDI SANTOSO\nTotal Tagihan Rp. 150.000")
+
+        empty_payload = create_empty_ocr_payload()
+        self.assertEqual(list(parsed.ocr_payload), list(empty_payload))
+        self.assertEqual({""}, set(empty_payload.values()))
+
+
+class _FakeOcrPdf:
+    """PyMuPDF document stand-in whose rendered pages are filled with their page index."""
+
+    def __init__(self, page_count: int, on_load: Optional[Callable[[int], None]] = None) -> None:
+        self.page_count = page_count
+        self.on_load = on_load
+        self.loaded: list[int] = []
+
+    def __enter__(self) -> _FakeOcrPdf:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+    def __len__(self) -> int:
+        return self.page_count
+
+    def load_page(self, index: int) -> SimpleNamespace:
+        self.loaded.append(index)
+        if self.on_load is not None:
+            self.on_load(index)
+        pixmap = SimpleNamespace(width=8, height=8, stride=8, samples=bytes([index]) * 64)
+        return SimpleNamespace(rect=SimpleNamespace(width=100.0), get_pixmap=lambda **_: pixmap)
+
+
+class OcrPageSelectionTests(unittest.TestCase):
+    """Run the OCR fallback with PyMuPDF and tesseract replaced by page-indexed fakes."""
+
+    def run_fake_ocr(
+        self,
+        pdf: _FakeOcrPdf,
+        recognize: Callable[[object, str, int], str],
+        *,
+        page_indices: Optional[list[int]] = None,
+        **settings: object,
+    ) -> str:
+        fake_fitz = SimpleNamespace(
+            open=lambda **_: pdf,
+            Matrix=lambda *_: None,
+            csGRAY=None,
+            TOOLS=SimpleNamespace(store_shrink=lambda _: None),
+        )
+        overrides = {
+            "OCR_ENRICH_ALWAYS": False,
+            "OCR_MULTI_PASS": False,
+            "OCR_MAX_PAGES": 0,
+            "OCR_EARLY_STOP": False,
+            "OCR_PAGE_WORKERS": 1,
+            **settings,
+        }
+        with ExitStack() as stack:
+            stack.enter_context(mock.patch.dict(sys.modules, {"fitz": fake_fitz}))
+            stack.enter_context(mock.patch.object(pdf_parser, "_tesseract_recognizer", return_value=recognize))
+            for name, value in overrides.items():
+                stack.enter_context(mock.patch.object(pdf_parser, name, value))
+            text, _ = pdf_parser._extract_text_via_ocr(b"%PDF-1.4", page_indices=page_indices)
+        return text
+
+    def test_requested_pages_keep_totals_first_priority_under_page_limit(self) -> None:
+        pdf = _FakeOcrPdf(10)
+        text = self.run_fake_ocr(
+            pdf,
+            lambda image, lang, psm: f"halaman {image.getpixel((0, 0))}",
+            page_indices=[1, 2, 5, 9],
+            OCR_MAX_PAGES=2,
+        )
+
+        self.assertEqual([9, 5], pdf.loaded)
+        self.assertEqual("=== PAGE 6 ===\nhalaman 5\n=== PAGE 10 ===\nhalaman 9", text)
+
+    def test_early_stop_skips_pages_after_total_and_name_are_read(self) -> None:
+        page_texts = {9: "TOTAL TAGIHAN Rp. 100.000", 8: "NAMA PASIEN : BUDI SANTOSO"}
+        pdf = _FakeOcrPdf(10)
+        text = self.run_fake_ocr(
+            pdf,
+            lambda image, lang, psm: page_texts.get(image.getpixel((0, 0)), "Farmasi Rp. 5.000"),
+            OCR_EARLY_STOP=True,
+        )
+
+        self.assertEqual([9, 8], pdf.loaded)
+        self.assertIn("=== PAGE 9 ===\nNAMA PASIEN", text)
+        self.assertNotIn("=== PAGE 8 ===", text)
+
+    def test_without_early_stop_every_page_is_ocrd(self) -> None:
+        page_texts = {9: "NAMA PASIEN : BUDI SANTOSO TOTAL TAGIHAN Rp. 100.000"}
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                pdf = _FakeOcrPdf(10)
+                text = self.run_fake_ocr(
+                    pdf,
+                    lambda image, lang, psm: page_texts.get(image.getpixel((0, 0)), "Farmasi Rp. 5.000"),
+                    OCR_PAGE_WORKERS=workers,
+                )
+
+                self.assertEqual(list(range(10)), sorted(pdf.loaded))
+                self.assertEqual(10, text.count("=== PAGE "))
+
+    def test_pooled_early_stop_keeps_pending_pages_and_drops_unsubmitted_one(self) -> None:
+        # Page 9 (OCR'd first) only finishes once page 5, the fifth render, is
+        # loaded, so the stop is seen while pages 8, 7 and 0 are still pending.
+        release_first_page = threading.Event()
+        recognized: set[int] = set()
+
+        def recognize(image: object, lang: str, psm: int) -> str:
+            page_index = image.getpixel((0, 0))  # type: ignore[attr-defined]
+            recognized.add(page_index)
+            if page_index == 9:
+                release_first_page.wait(timeout=5)
+                return "NAMA PASIEN : BUDI SANTOSO TOTAL TAGIHAN Rp. 100.000"
+            return f"Farmasi halaman {page_index}"
+
+        pdf = _FakeOcrPdf(10, on_load=lambda index: release_first_page.set() if index == 5 else None)
+        text = self.run_fake_ocr(pdf, recognize, OCR_EARLY_STOP=True, OCR_PAGE_WORKERS=2)
+
+        self.assertEqual([9, 8, 7, 0, 5], pdf.loaded)
+        self.assertEqual({9, 8, 7, 0}, recognized)
+        for page_number in (1, 8, 9, 10):
+            self.assertIn(f"=== PAGE {page_number} ===", text)
+        self.assertNotIn("=== PAGE 6 ===", text)
+
+
+class SecondaryTextExtractionTests(unittest.TestCase):
+    """PyMuPDF only re-reads the PDF when pdfplumber text still needs enrichment."""
+
+    def extract_with_primary_text(self, primary_text: str, **settings: object) -> mock.Mock:
+        pymupdf_pages = mock.Mock(return_value=[])
+        overrides = {"OCR_ENRICH_ALWAYS": False, "PDF_SECONDARY_TEXT_ALWAYS": False, **settings}
+        with ExitStack() as stack:
+            stack.enter_context(mock.patch.object(pdf_parser, "_pdfplumber_page_texts", return_value=[primary_text]))
+            stack.enter_context(mock.patch.object(pdf_parser, "_pymupdf_page_texts", pymupdf_pages))
+            stack.enter_context(mock.patch.object(pdf_parser, "_extract_text_via_ocr", return_value=("", [])))
+            for name, value in overrides.items():
+                stack.enter_context(mock.patch.object(pdf_parser, name, value))
+            pdf_parser.extract_text_from_pdf(b"%PDF-1.4")
+        return pymupdf_pages
+
+    def test_rich_primary_text_skips_pymupdf(self) -> None:
+        marked_text = "RINCIAN BIAYA PELAYANAN PASIEN\nNama Pasien: BUDI SANTOSO\nTotal Tagihan Rp. 150.000"
+        long_text = "RINCIAN BIAYA PELAYANAN PASIEN\n" + "Laboratorium Darah Lengkap Rp. 75.000\n" * 60
+
+        self.extract_with_primary_text(marked_text).assert_not_called()
+        self.extract_with_primary_text(long_text).assert_not_called()
+
+    def test_sparse_or_garbled_primary_text_still_reads_pymupdf(self) -> None:
+        garbled_text = "~~ |{ }^ ` _ ~| {{ }} ^^ ` __ ~~ || {} ^` _~ |{ }^ ` _ ~| {{ 1l1 I|I 0O0 ;: ,. ~~"
+
+        self.extract_with_primary_text("Hal 1").assert_called_once_with(b"%PDF-1.4")
+        self.extract_with_primary_text(garbled_text).assert_called_once_with(b"%PDF-1.4")
+
+    def test_secondary_text_always_setting_forces_pymupdf(self) -> None:
+        marked_text = "RINCIAN BIAYA PELAYANAN PASIEN\nNama Pasien: BUDI SANTOSO\nTotal Tagihan Rp. 150.000"
+
+        self.extract_with_primary_text(marked_text, PDF_SECONDARY_TEXT_ALWAYS=True).assert_called_once()
+
+
+@unittest.skipUnless(importlib.util.find_spec("fitz"), "PyMuPDF is not installed")
+class ParallelPageTextTests(unittest.TestCase):
+    """Large PDFs fan page text extraction out to the shared worker pool."""
+
+    def test_parallel_page_text_matches_serial_and_reuses_pool(self) -> None:
+        import fitz  # type: ignore[import-not-found]
+
+        with fitz.open() as document:
+            for page_number in range(1, 6):
+                document.new_page().insert_text((72, 72), f"Halaman {page_number} Rp. {page_number}.000")
+            pdf_bytes = document.tobytes()
+
+        serial_pages = pdf_parser._pymupdf_page_texts(pdf_bytes)
+        self.addCleanup(pdf_parser.shutdown_page_text_pool)
+        with mock.patch.object(pdf_parser, "PDF_TEXT_WORKERS", 2), mock.patch.object(
+            pdf_parser, "PDF_TEXT_PARALLEL_MIN_PAGES", 2
+        ):
+            parallel_pages = pdf_parser._pymupdf_page_texts(pdf_bytes)
+            pool = pdf_parser._PAGE_TEXT_POOL
+            self.assertEqual(parallel_pages, pdf_parser._pymupdf_page_texts(pdf_bytes))
+
+        self.assertEqual(5, len(serial_pages))
+        self.assertIn("Halaman 5", serial_pages[4])
+        self.assertEqual(serial_pages, parallel_pages)
+        self.assertIsNotNone(pool)
+        self.assertIs(pool, pdf_parser._PAGE_TEXT_POOL)
+
+        pdf_parser.shutdown_page_text_pool()
+        self.assertIsNone(pdf_parser._PAGE_TEXT_POOL)
+
+
 if __name__ == "__main__":
     unittest.main()